@@ -1,10 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
 import os
 import json
 import re
+from .history import HistorySummarizer, SUMMARY_PREFIX
+from .messages import MessageStore
+from .tokens import TokenCounter, context_window_for, default_token_counter
+from .tool_calls import IncrementalToolCallParser, repair_json, scan_tool_calls
+from .toolset import ToolSet
+from .transactions import Transaction
+
+# Content left in a native tool result that was pruned from the context.
+TOOL_OUTPUT_DROPPED = "[Tool output removed to save context.]"
+# Truncated tool output keeps this share of its token budget from the start and the rest
+# from the end, after a small reserve for the truncation marker and char/token estimation.
+TRUNCATE_HEAD_SHARE = 0.8
+TRUNCATE_RESERVE_SHARE = 0.05
+# Error bodies that blame the request's `tools` / `tool_choice` fields.
+_TOOLS_ERROR_RE = re.compile(r"\btools?\b|tool_choice|function[_ ]call", re.IGNORECASE)
 
 class Tool(ABC):
+    # Set by bind_ui(); tools that report progress check it before using it.
+    ui = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -23,24 +42,86 @@ class Tool(ABC):
     def to_schema(self) -> Dict[str, Any]:
         pass
 
+    @property
+    def read_only(self) -> bool:
+        """True if the tool never changes files or other state, so calls may run concurrently."""
+        return False
+
+    def bind_ui(self, ui) -> None:
+        """Gives the tool the agent's UI so long-running tools can report progress."""
+        self.ui = ui
+
 class Agent:
-    def __init__(self, provider, tools: List[Tool], system_prompt: str = "", model: str = "zai-glm-4-flash", ui=None):
+    def __init__(
+        self,
+        provider,
+        tools: Union[List[Tool], ToolSet],
+        system_prompt: str = "",
+        model: str = "zai-glm-4-flash",
+        ui=None,
+        stream: Optional[bool] = None,
+        token_counter: Optional[TokenCounter] = None,
+        native_tools: Optional[bool] = None,
+    ):
         self.provider = provider
-        self.tools = {t.name: t for t in tools}
+        self.toolset = tools if isinstance(tools, ToolSet) else ToolSet(tools)
+        self.tools = self.toolset.as_dict()
         self.system_prompt = system_prompt
         self.model = model
-        self.messages = []
+        self.token_counter = token_counter or default_token_counter(model)
+        self.messages = MessageStore(self._is_tool_output_message, measure=self._message_tokens)
         self.ui = ui
-        self._max_tool_output_chars = int(os.getenv("AI_CONGRESS_MAX_TOOL_OUTPUT_CHARS", "8000"))
+        if ui is not None:
+            for tool in self.toolset:
+                tool.bind_ui(ui)
+        self._max_tool_output_tokens = int(os.getenv("AI_CONGRESS_MAX_TOOL_OUTPUT_TOKENS", "2000"))
         self._max_tool_output_messages = int(os.getenv("AI_CONGRESS_MAX_TOOL_OUTPUT_MESSAGES", "6"))
-        self._max_context_chars = int(os.getenv("AI_CONGRESS_MAX_CONTEXT_CHARS", "60000"))
+        # Default budget: 60% of the model's window, leaving room for the reply and summaries.
+        self._max_context_tokens = int(os.getenv("AI_CONGRESS_MAX_CONTEXT_TOKENS", "0")) or int(context_window_for(model) * 0.6)
         self._min_messages_to_keep = 10
+        self.summarizer = HistorySummarizer(provider, model)
+        self._summary_executor: Optional[ThreadPoolExecutor] = None
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+        self._max_parallel_tools = max(1, int(os.getenv("AI_CONGRESS_TOOL_WORKERS", "4")))
+        self._tool_call_errors: List[str] = []
+        self._background_summary = None
+        if stream is None:
+            stream = os.getenv("AI_CONGRESS_STREAM", "0") == "1"
+        self.stream = bool(stream)
+        # Native function calling (the API's `tools` field) instead of JSON blocks in the text.
+        if native_tools is None:
+            native_tools = os.getenv("AI_CONGRESS_NATIVE_TOOLS", "0") == "1"
+        self.native_tools = bool(native_tools)
+        self._native_confirmed = False
+        # File edits made during one run() commit together, or roll back if the run fails.
+        self.transactional = os.getenv("AI_CONGRESS_TRANSACTIONS", "1") != "0"
         if self.system_prompt:
             self.messages.append({"role": "system", "content": self._build_system_prompt()})
 
     def _build_system_prompt(self) -> str:
-        tool_descriptions = "\n".join([json.dumps(t.to_schema(), indent=2) for t in self.tools.values()])
-        base_prompt = (
+        # Native tool results arrive as `tool` messages; prompt-embedded ones as "Tool Output:".
+        result = "tool result" if self.native_tools else "Tool Output"
+        rules = (
+            "IMPORTANT:\n"
+            f"1. After receiving a {result}, you must use that information to FULFILL the user's original request.\n"
+            "2. Do not just describe the tool output unless asked.\n"
+            f"3. If the user asked you to do something (e.g., create a file), and the {result.lower()} says it was successful, YOUR JOB IS DONE. Report the success to the user.\n"
+            "4. If you need to find files or code but don't know where they are, ALWAYS start by using 'list_directory' with path='.' to see what is available.\n"
+            "5. Use 'system_shell' ONLY for tasks not covered by other tools, or if explicitly requested. It is a powerful fallback.\n"
+            "6. ACTION BIAS: If the user asks you to do something (e.g., 'create a landing page') and you have the info, DO NOT ask for permission to create the file. JUST CREATE IT using 'modify_file'.\n"
+            "7. ACTION BIAS: If the user says 'go ahead', 'yes', or 'do it', EXECUTE the planned action immediately.\n"
+            "8. For large files: use 'search_text' to locate relevant areas, then 'read_file' with start_line/max_lines (optionally with_line_numbers). Do NOT try to read entire huge files at once.\n"
+            "9. For edits: prefer 'apply_patch' (unified diff) for targeted changes. Use 'modify_file' only when you intend to overwrite the whole file.\n"
+        )
+        if self.native_tools:
+            # Tool schemas travel in the request's `tools` field.
+            return (
+                f"{self.system_prompt}\n\n"
+                f"{rules}"
+                "10. Independent read-only calls (read_file, search_text, list_directory) can be made together in one turn."
+            )
+        tool_descriptions = self.toolset.schema_text()
+        return (
             f"{self.system_prompt}\n\n"
             "You have access to the following tools:\n"
             f"{tool_descriptions}\n\n"
@@ -51,61 +132,126 @@ class Agent:
             '  "args": { "arg_name": "value" }\n'
             "}\n"
             "```\n"
-            "IMPORTANT:\n"
-            "1. After receiving a Tool Output, you must use that information to FULFILL the user's original request.\n"
-            "2. Do not just describe the tool output unless asked.\n"
-            "3. If the user asked you to do something (e.g., create a file), and the tool output says it was successful, YOUR JOB IS DONE. Report the success to the user.\n"
-            "4. If you need to find files or code but don't know where they are, ALWAYS start by using 'list_directory' with path='.' to see what is available.\n"
-            "5. Use 'system_shell' ONLY for tasks not covered by other tools, or if explicitly requested. It is a powerful fallback.\n"
-            "6. ACTION BIAS: If the user asks you to do something (e.g., 'create a landing page') and you have the info, DO NOT ask for permission to create the file. JUST CREATE IT using 'modify_file'.\n"
-            "7. ACTION BIAS: If the user says 'go ahead', 'yes', or 'do it', EXECUTE the planned action immediately.\n"
-            "8. For large files: use 'search_text' to locate relevant areas, then 'read_file' with start_line/max_lines (optionally with_line_numbers). Do NOT try to read entire huge files at once.\n"
-            "9. For edits: prefer 'apply_patch' (unified diff) for targeted changes. Use 'modify_file' only when you intend to overwrite the whole file.\n"
+            f"{rules}"
             "10. REGEX WARNING: When using regex in JSON (e.g. for search_text), you MUST double-escape backslashes. Example: use '\\\\d' for digit, NOT '\\d'. Use '[\\\\s\\\\S]' NOT '[\\s\\S]'. Invalid JSON will cause failure."
         )
-        return base_prompt
 
-    def _approx_context_chars(self) -> int:
-        return sum(len(str(m.get("content", ""))) for m in self.messages)
+    def _message_tokens(self, message: Dict[str, Any]) -> int:
+        # Counted once per message by the MessageStore; +4 approximates per-message framing.
+        tokens = self.token_counter.count(str(message.get("content") or "")) + 4
+        if message.get("tool_calls"):
+            tokens += self.token_counter.count(json.dumps(message["tool_calls"]))
+        return tokens
+
+    def _approx_context_tokens(self) -> int:
+        return self.messages.total_size
 
     def _is_tool_output_message(self, message: Dict[str, Any]) -> bool:
+        if message.get("role") == "tool":
+            # A dropped native result stays as a placeholder: its call id must keep an answer.
+            return message.get("content") != TOOL_OUTPUT_DROPPED
         return (
             message.get("role") == "user"
             and isinstance(message.get("content"), str)
             and message["content"].startswith("Tool Output:")
         )
 
-    def _truncate_text(self, text: str, max_chars: int) -> str:
+    def _drop_tool_output(self, idx: int) -> None:
+        if self.messages[idx].get("role") == "tool":
+            self.messages.set_content(idx, TOOL_OUTPUT_DROPPED)
+        else:
+            del self.messages[idx]
+
+    def _truncate_text(self, text: str, max_tokens: int) -> str:
         if not isinstance(text, str):
             text = str(text)
-        if max_chars <= 0:
+        if max_tokens <= 0:
             return ""
-        if len(text) <= max_chars:
+        total_tokens = self.token_counter.count(text)
+        if total_tokens <= max_tokens:
             return text
 
-        head = min(6000, max_chars)
-        tail = min(1500, max_chars - head)
-        omitted = len(text) - head - tail
+        usable = int(max_tokens * (1 - TRUNCATE_RESERVE_SHARE))
+        head_tokens = int(usable * TRUNCATE_HEAD_SHARE)
+        tail_tokens = usable - head_tokens
+        # Map the token budget back to characters using this text's own density.
+        chars_per_token = len(text) / total_tokens
+        head = int(head_tokens * chars_per_token)
+        tail = int(tail_tokens * chars_per_token)
+        omitted = total_tokens - head_tokens - tail_tokens
         suffix = text[-tail:] if tail > 0 else ""
         return (
-            f"[Tool output truncated: {len(text)} chars total; omitted {omitted} chars]\n"
+            f"[Tool output truncated: ~{total_tokens} tokens total; omitted ~{omitted} tokens]\n"
             f"{text[:head]}\n...\n{suffix}"
         )
 
+    def _summary_index(self) -> Optional[int]:
+        system_offset = 1 if self.messages and self.messages[0].get("role") == "system" else 0
+        if len(self.messages) > system_offset:
+            m = self.messages[system_offset]
+            if m.get("role") == "system" and str(m.get("content", "")).startswith(SUMMARY_PREFIX):
+                return system_offset
+        return None
+
+    def _unsummarized_span(self) -> Tuple[int, int]:
+        """[start, end) of the messages between the rolling summary and the latest message."""
+        system_offset = 1 if self.messages and self.messages[0].get("role") == "system" else 0
+        summary_idx = self._summary_index()
+        start = summary_idx + 1 if summary_idx is not None else system_offset
+        end = len(self.messages) - 1
+        # Native tool results must stay with the assistant message that requested them.
+        while end > start and self.messages[end].get("role") == "tool":
+            end -= 1
+        return start, end
+
+    def _start_background_compression(self) -> None:
+        """Summarizes the pending span off-thread (e.g. while tools run) if compression is close."""
+        if self._background_summary is not None:
+            return
+        if self._approx_context_tokens() < self._max_context_tokens * 0.75:
+            return
+        start, end = self._unsummarized_span()
+        if end - start < 3:
+            return
+        span = self.messages[start:end]
+        if self._summary_executor is None:
+            self._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+        self._background_summary = (span, self._summary_executor.submit(self.summarizer.summarize_span, span))
+
+    def _take_background_summary(self, span: List[Dict[str, Any]]) -> Tuple[Optional[str], int]:
+        """
+        Returns (summary, covered) from a finished/running background job whose span is a
+        prefix of `span` (same message objects), or (None, 0) if it no longer applies.
+        """
+        job, self._background_summary = self._background_summary, None
+        if job is None:
+            return None, 0
+        job_span, future = job
+        if len(job_span) > len(span) or any(a is not b for a, b in zip(job_span, span)):
+            future.cancel()
+            return None, 0
+        try:
+            return future.result(), len(job_span)
+        except Exception:
+            return None, 0
+
     def _compress_history(self) -> None:
-        """Compresses the message history by summarizing older messages."""
+        """
+        Folds the newest unsummarized span of history into the rolling summary.
+
+        Only messages added since the previous compression are summarized (reusing a
+        background result when one covers them); the summary tree merges older parts.
+        """
         # Don't compress if we don't have enough history
         if len(self.messages) < 5:
             return
 
-        system_offset = 1 if self.messages and self.messages[0].get("role") == "system" else 0
-        messages_to_summarize = self.messages[system_offset:-1]
-        
-        if not messages_to_summarize:
+        start, end = self._unsummarized_span()
+        if end - start < 1:
             return
 
-        chars_to_compress = sum(len(str(m.get("content", ""))) for m in messages_to_summarize)
-        if chars_to_compress < self._max_context_chars * 0.5: 
+        tokens_to_compress = sum(self.messages.size_of(i) for i in range(start, end))
+        if tokens_to_compress < self._max_context_tokens * 0.5:
             return
 
         if self.ui:
@@ -113,36 +259,26 @@ class Agent:
         else:
             print("Compressing conversation history...")
 
-        conversation_text = ""
-        for m in messages_to_summarize:
-            role = m.get("role", "unknown")
-            content = m.get("content", "")
-            conversation_text += f"{role.upper()}: {content}\n\n"
-
-        summary_prompt = [
-            {"role": "system", "content": "You are a helpful assistant. Summarize the following conversation history concisely, retaining key information, decisions, and current state. The summary will be used as context for future actions."},
-            {"role": "user", "content": f"Conversation to summarize:\n{conversation_text}"}
-        ]
-        
         try:
-            summary = self.provider.generate(summary_prompt, model=self.model)
-            
-            new_messages = []
-            if system_offset == 1:
-                new_messages.append(self.messages[0])
-            
-            new_messages.append({
-                "role": "system", 
-                "content": f"Previous Conversation Summary:\n{summary}"
-            })
-            
-            new_messages.append(self.messages[-1])
-            
-            self.messages = new_messages
-            
+            span = self.messages[start:end]
+            summary, covered = self._take_background_summary(span)
+            if summary is not None:
+                self.summarizer.add(summary)
+            if covered < len(span):
+                self.summarizer.add(self.summarizer.summarize_span(span[covered:]))
+
+            rendered = self.summarizer.render()
+            self.messages.delete_range(start, end)
+            summary_idx = self._summary_index()
+            if summary_idx is not None:
+                self.messages.set_content(summary_idx, rendered)
+            else:
+                system_offset = 1 if self.messages and self.messages[0].get("role") == "system" else 0
+                self.messages.insert(system_offset, {"role": "system", "content": rendered})
+
             if self.ui:
-                self.ui.print_tool_result(f"History compressed. Summary length: {len(summary)} chars.", is_error=False)
-            
+                self.ui.print_tool_result(f"History compressed. Summary length: {len(rendered)} chars.", is_error=False)
+
         except Exception as e:
             if self.ui:
                 self.ui.print_tool_result(f"Failed to compress history: {e}", is_error=True)
@@ -153,208 +289,328 @@ class Agent:
             return
 
         # 1) Ensure tool outputs are not massive.
-        for message in self.messages:
-            if self._is_tool_output_message(message):
-                content = message.get("content", "")
-                if isinstance(content, str) and len(content) > self._max_tool_output_chars:
-                    prefix = "Tool Output:"
-                    rest = content[len(prefix):].lstrip("\n")
-                    budget = max(0, self._max_tool_output_chars - len(prefix) - 1)
-                    message["content"] = f"{prefix}\n{self._truncate_text(rest, budget)}"
+        for idx in self.messages.tool_output_positions():
+            content = self.messages[idx].get("content", "")
+            if isinstance(content, str) and self.messages.size_of(idx) > self._max_tool_output_tokens:
+                if self.messages[idx].get("role") == "tool":
+                    budget = max(0, self._max_tool_output_tokens - 4)
+                    self.messages.set_content(idx, self._truncate_text(content, budget))
+                    continue
+                prefix = "Tool Output:"
+                rest = content[len(prefix):].lstrip("\n")
+                budget = max(0, self._max_tool_output_tokens - self.token_counter.count(prefix) - 4)
+                self.messages.set_content(idx, f"{prefix}\n{self._truncate_text(rest, budget)}")
 
         # 2) Keep only the most recent N tool outputs.
-        tool_indices = [i for i, m in enumerate(self.messages) if self._is_tool_output_message(m)]
+        tool_indices = self.messages.tool_output_positions()
         if self._max_tool_output_messages > 0 and len(tool_indices) > self._max_tool_output_messages:
             to_remove = tool_indices[: len(tool_indices) - self._max_tool_output_messages]
             for idx in reversed(to_remove):
-                del self.messages[idx]
+                self._drop_tool_output(idx)
 
         # 3) Check if we need to compress history
-        if self._approx_context_chars() > self._max_context_chars:
+        if self._approx_context_tokens() > self._max_context_tokens:
             self._compress_history()
 
         # 4) If STILL too large after compression (or if compression failed/skipped), prune.
         def system_offset() -> int:
             return 1 if self.messages and self.messages[0].get("role") == "system" else 0
 
-        while self._approx_context_chars() > self._max_context_chars and len(self.messages) > 2:
-            removed = False
-            for i in range(system_offset(), len(self.messages)):
-                if self._is_tool_output_message(self.messages[i]):
-                    del self.messages[i]
-                    removed = True
-                    break
-
-            if removed:
+        while self._approx_context_tokens() > self._max_context_tokens and len(self.messages) > 2:
+            oldest_tool_output = self.messages.first_tool_output(system_offset())
+            if oldest_tool_output is not None:
+                self._drop_tool_output(oldest_tool_output)
                 continue
 
             if len(self.messages) <= system_offset() + self._min_messages_to_keep:
                 break
             del self.messages[system_offset()]
+            # Results whose requesting assistant message is gone would be rejected by the API.
+            while len(self.messages) > system_offset() + 1 and self.messages[system_offset()].get("role") == "tool":
+                del self.messages[system_offset()]
+
+    def _validate_tool_call(self, tool_name: str, tool_args: Any) -> Optional[str]:
+        """Returns a description of what is wrong with a tool call, or None if it looks runnable."""
+        if tool_name not in self.tools:
+            return f"Tool '{tool_name}' not found."
+        if not isinstance(tool_args, dict):
+            return f"Arguments for '{tool_name}' must be a JSON object."
+        required = self.toolset.schema(tool_name).get("parameters", {}).get("required", [])
+        missing = [arg for arg in required if arg not in tool_args]
+        if missing:
+            return f"Missing required argument(s) for '{tool_name}': {', '.join(missing)}"
+        return None
+
+    def _generate_response(self) -> str:
+        if not self.stream:
+            if self.ui:
+                with self.ui.status("Thinking..."):
+                    return self.provider.generate(self.messages.to_list(), model=self.model)
+            print("Thinking...")
+            return self.provider.generate(self.messages.to_list(), model=self.model)
+
+        # Streaming: render tokens live and validate tool blocks as soon as their fence closes.
+        parser = IncrementalToolCallParser()
+        live = self.ui.stream_live("Thinking...") if self.ui else None
+        try:
+            for delta in self.provider.stream(self.messages.to_list(), model=self.model):
+                if live:
+                    live.update(delta)
+                for tool_name, tool_args in parser.feed(delta):
+                    problem = self._validate_tool_call(tool_name, tool_args)
+                    if self.ui:
+                        if problem:
+                            self.ui.print_tool_result(f"Streamed tool call is invalid: {problem}", is_error=True)
+                        else:
+                            self.ui.print_tool_result(f"Tool call ready: {tool_name}", is_error=False)
+                    elif problem:
+                        print(f"Streamed tool call is invalid: {problem}")
+        finally:
+            if live:
+                live.close()
+        return parser.text
+
+    def record_exchange(self, user_input: str, response: str) -> None:
+        """Adds a turn answered elsewhere (e.g. by triage) so later runs can refer to it."""
+        self.messages.append({"role": "user", "content": user_input})
+        self.messages.append({"role": "assistant", "content": response})
 
     def run(self, user_input: str) -> str:
+        if not self.transactional:
+            return self._run(user_input)
+
+        with Transaction() as tx:
+            try:
+                return self._run(user_input)
+            except KeyboardInterrupt:
+                # The user stopped the run; edits made so far are kept.
+                kept = tx.changed_paths()
+                tx.commit()
+                if kept:
+                    note = f"Interrupted; kept changes to {len(kept)} file(s)."
+                    if self.ui:
+                        self.ui.print_tool_result(note, is_error=True)
+                    else:
+                        print(note)
+                raise
+            except BaseException:
+                restored = tx.rollback()
+                if restored:
+                    note = f"Run failed; rolled back changes to {len(restored)} file(s)."
+                    if self.ui:
+                        self.ui.print_tool_result(note, is_error=True)
+                    else:
+                        print(note)
+                raise
+
+    def _run(self, user_input: str) -> str:
         self.messages.append({"role": "user", "content": user_input})
         
         last_tool_call_signature = None
         consecutive_loops = 0
+        parse_retries = 0
 
         while True:
             self._enforce_context_limits()
             # Call LLM
-            if self.ui:
-                with self.ui.status("Thinking..."):
-                    response_content = self.provider.generate(self.messages, model=self.model)
-            else:
-                print("Thinking...")
-                response_content = self.provider.generate(self.messages, model=self.model)
+            response_content, tool_calls = self._next_response()
 
-            self.messages.append({"role": "assistant", "content": response_content})
-            
-            # Check for tool calls
-            tool_calls = self._parse_tool_calls(response_content)
-            
             if not tool_calls:
+                # A tool call that failed to parse gets the error back instead of ending the run.
+                if self._tool_call_errors and parse_retries < 2:
+                    parse_retries += 1
+                    result = "System Error: Your tool call could not be parsed:\n" + "\n".join(
+                        f"- {error}" for error in self._tool_call_errors
+                    ) + "\nSend it again as one valid JSON object inside ```json fences."
+                    if self.ui:
+                        self.ui.print_tool_result(result, is_error=True)
+                    else:
+                        print(result)
+                    self.messages.append({"role": "user", "content": f"Tool Output:\n{result}"})
+                    continue
                 return response_content
-            
-            # Execute tools
-            for tool_name, tool_args in tool_calls:
-                # Loop detection
+            parse_retries = 0
+
+            # Summarize older history in the background while the tools run.
+            self._start_background_compression()
+
+            # Loop detection runs in call order before anything executes.
+            planned: List[Tuple[str, Any, Optional[str], Optional[str]]] = []
+            for tool_name, tool_args, error, call_id in tool_calls:
                 current_signature = (tool_name, json.dumps(tool_args, sort_keys=True))
                 if current_signature == last_tool_call_signature:
                     consecutive_loops += 1
-                    if consecutive_loops >= 1:
-                        result = (
+                    if consecutive_loops >= 1 and error is None:
+                        # We don't execute the tool; the model must change its approach.
+                        error = (
                             "System Error: You are calling the exact same tool with the same arguments "
                             "as the previous step. This is a loop. You MUST change your arguments or approach."
                         )
-                        if self.ui:
-                            self.ui.print_tool_result(result, is_error=True)
-                        else:
-                            print(f"Loop detected: {result}")
-                        
-                        # Add to history and continue to next iteration of while loop (new generation)
-                        # We don't execute the tool.
-                        safe_result = self._truncate_text(result, self._max_tool_output_chars)
-                        self.messages.append({
-                            "role": "user", 
-                            "content": f"Tool Output:\n{safe_result}"
-                        })
-                        continue
                 else:
                     consecutive_loops = 0
                     last_tool_call_signature = current_signature
+                planned.append((tool_name, tool_args, error, call_id))
 
-                if self.ui:
-                    self.ui.print_tool_call(tool_name, json.dumps(tool_args))
-                else:
-                    print(f"Executing tool: {tool_name} with args {tool_args}")
-                
-                if tool_name in self.tools:
-                    try:
+            for batch in self._schedule_tool_calls(planned):
+                results = self._run_tool_batch(batch)
+                for (tool_name, tool_args, error, call_id), result in zip(batch, results):
+                    if error is not None:
                         if self.ui:
-                            with self.ui.status(f"Executing {tool_name}..."):
-                                result = self.tools[tool_name].execute(**tool_args)
+                            self.ui.print_tool_result(result, is_error=True)
                         else:
-                            result = self.tools[tool_name].execute(**tool_args)
-                    except Exception as e:
-                        result = f"Error executing tool: {str(e)}"
-                else:
-                    result = f"Error: Tool '{tool_name}' not found."
+                            print(f"Tool call rejected: {result}")
+                        safe_result = self._truncate_text(result, self._max_tool_output_tokens)
+                        self.messages.append(self._tool_result_message(call_id, safe_result))
+                        continue
+
                     if self.ui:
-                        self.ui.print_tool_result(result, is_error=True)
+                        self.ui.print_tool_result(result, is_error=result.startswith("Error"))
                     else:
-                        print(f"Error: {result}")
+                        print(f"Tool result: {result}")
+
+                    safe_result = self._truncate_text(result, self._max_tool_output_tokens)
+
+                    # Add a system reminder to the tool output to keep the agent on track
+                    self.messages.append(self._tool_result_message(
+                        call_id,
+                        f"{safe_result}\n\n"
+                        f"(Remember to use this information to answer the user's original request: '{user_input}')",
+                    ))
+
+                    self._enforce_context_limits()
+
+    def _tool_result_message(self, call_id: Optional[str], content: str) -> Dict[str, Any]:
+        if call_id is not None:
+            return {"role": "tool", "tool_call_id": call_id, "content": content}
+        return {"role": "user", "content": f"Tool Output:\n{content}"}
+
+    def _native_unsupported(self, error: Exception) -> bool:
+        """True when the endpoint rejected the request because of the tools themselves."""
+        if isinstance(error, NotImplementedError):
+            return True
+        message = str(error)
+        if not message.startswith(("HTTP error 400", "HTTP error 404", "HTTP error 422", "HTTP error 501")):
+            return False
+        # Bad prompts, context overflows and the like must not switch native calls off for good.
+        return bool(_TOOLS_ERROR_RE.search(message))
+
+    def _generate_native_response(self) -> Optional[Dict[str, Any]]:
+        """One native function-calling turn, or None after falling back to prompt-embedded tools."""
+        try:
+            if self.ui:
+                with self.ui.status("Thinking..."):
+                    reply = self.provider.generate_with_tools(self.messages.to_list(), model=self.model, tools=self.toolset.function_specs())
+            else:
+                print("Thinking...")
+                reply = self.provider.generate_with_tools(self.messages.to_list(), model=self.model, tools=self.toolset.function_specs())
+        except Exception as e:
+            # Only a rejection before native calls ever worked means the endpoint lacks support.
+            if self._native_confirmed or not self._native_unsupported(e):
+                raise
+            self.native_tools = False
+            if self.system_prompt and self.messages and self.messages[0].get("role") == "system":
+                self.messages.set_content(0, self._build_system_prompt())
+            note = f"Native tool calls unavailable ({str(e)[:120]}); using prompt-embedded tools."
+            if self.ui:
+                self.ui.print_tool_result(note, is_error=True)
+            else:
+                print(note)
+            return None
+        self._native_confirmed = True
+        return reply
+
+    def _next_response(self) -> Tuple[str, List[Tuple[str, Any, Optional[str], Optional[str]]]]:
+        """
+        Generates and records the next assistant turn. Returns (content, calls) where each
+        call is (tool_name, args, error, call_id); call_id is None for prompt-embedded calls
+        and error is set when a native call's arguments could not be decoded.
+        """
+        if self.native_tools:
+            reply = self._generate_native_response()
+            if reply is not None:
+                self._tool_call_errors = []
+                calls = []
+                message: Dict[str, Any] = {"role": "assistant", "content": reply["content"]}
+                if reply["tool_calls"]:
+                    message["tool_calls"] = [
+                        {
+                            "id": call["id"],
+                            "type": "function",
+                            "function": {"name": call["name"], "arguments": call["raw_arguments"]},
+                        }
+                        for call in reply["tool_calls"]
+                    ]
+                for call in reply["tool_calls"]:
+                    if isinstance(call["arguments"], dict):
+                        calls.append((call["name"], call["arguments"], None, call["id"]))
+                    else:
+                        error = f"Error: Arguments for '{call['name']}' must be a JSON object; got: {call['raw_arguments'][:200]}"
+                        calls.append((call["name"], {}, error, call["id"]))
+                self.messages.append(message)
+                return reply["content"], calls
+
+        response_content = self._generate_response()
+        self.messages.append({"role": "assistant", "content": response_content})
+        return response_content, [(name, args, None, None) for name, args in self._parse_tool_calls(response_content)]
+
+    def _schedule_tool_calls(self, planned: List[Tuple[str, Any, Optional[str], Optional[str]]]) -> List[List[Tuple[str, Any, Optional[str], Optional[str]]]]:
+        """
+        Splits the calls of one turn into batches that run in order. Consecutive calls
+        to read-only tools share a batch (and run concurrently); every other call is a
+        batch of its own, so mutations keep their order relative to everything else.
+        """
+        batches: List[List[Tuple[str, Any, Optional[str], Optional[str]]]] = []
+        batch_open = False
+        for call in planned:
+            tool_name, _, error, _ = call
+            tool = self.tools.get(tool_name)
+            parallel = error is None and tool is not None and tool.read_only
+            if parallel and batch_open:
+                batches[-1].append(call)
+            else:
+                batches.append([call])
+            batch_open = parallel
+        return batches
 
+    def _execute_tool(self, tool_name: str, tool_args: Any) -> str:
+        if tool_name not in self.tools:
+            return f"Error: Tool '{tool_name}' not found."
+        try:
+            return self.tools[tool_name].execute(**tool_args)
+        except Exception as e:
+            return f"Error executing tool: {str(e)}"
+
+    def _run_tool_batch(self, batch: List[Tuple[str, Any, Optional[str], Optional[str]]]) -> List[str]:
+        """Executes one batch and returns the results in call order."""
+        for tool_name, tool_args, error, _ in batch:
+            if error is None:
                 if self.ui:
-                    self.ui.print_tool_result(result, is_error=result.startswith("Error"))
+                    self.ui.print_tool_call(tool_name, json.dumps(tool_args))
                 else:
-                    print(f"Tool result: {result}")
-
-                safe_result = self._truncate_text(result, self._max_tool_output_chars)
-
-                # Add a system reminder to the tool output to keep the agent on track
-                self.messages.append({
-                    "role": "user", 
-                    "content": (
-                        f"Tool Output:\n{safe_result}\n\n"
-                        f"(Remember to use this information to answer the user's original request: '{user_input}')"
-                    )
-                })
+                    print(f"Executing tool: {tool_name} with args {tool_args}")
 
-                self._enforce_context_limits()
+        if len(batch) == 1:
+            tool_name, tool_args, error, _ = batch[0]
+            if error is not None:
+                return [error]
+            if self.ui and tool_name in self.tools:
+                with self.ui.status(f"Executing {tool_name}..."):
+                    return [self._execute_tool(tool_name, tool_args)]
+            return [self._execute_tool(tool_name, tool_args)]
+
+        if self._tool_executor is None:
+            self._tool_executor = ThreadPoolExecutor(max_workers=self._max_parallel_tools, thread_name_prefix="agent-tool")
+        futures = [self._tool_executor.submit(self._execute_tool, name, args) for name, args, _, _ in batch]
+        if self.ui:
+            with self.ui.status(f"Executing {len(batch)} read-only tools in parallel..."):
+                return [f.result() for f in futures]
+        return [f.result() for f in futures]
 
     def _repair_json(self, json_str: str) -> str:
         """Attempts to repair common JSON errors, specifically unescaped backslashes."""
-        # Replace unescaped backslashes that are NOT part of a valid escape sequence.
-        # Valid escapes: \" \\ \/ \b \f \n \r \t \uXXXX
-        # Regex: \\(?![/\"\\bfnrtu])
-        return re.sub(r'\\(?![/\"\\bfnrtu])', r'\\\\', json_str)
+        return repair_json(json_str)
 
     def _parse_tool_calls(self, content: str) -> List[tuple]:
-        tool_calls = []
-
-        # Primary channel: look for ```json code blocks
-        matches = re.findall(r"```json\s*(\{.*?\})\s*```", content, re.DOTALL)
-        for match in matches:
-            try:
-                data = json.loads(match)
-                if "tool" in data:
-                    tool_calls.append((data["tool"], data.get("args", {})))
-            except json.JSONDecodeError:
-                try:
-                    repaired = self._repair_json(match)
-                    data = json.loads(repaired)
-                    if "tool" in data:
-                        tool_calls.append((data["tool"], data.get("args", {})))
-                except:
-                    pass
-
-        if tool_calls:
-            return tool_calls
-
-        # Fallback: scan for raw JSON objects in the stream even if fences are missing
-        decoder = json.JSONDecoder()
-        idx = 0
-        length = len(content)
-
-        while idx < length:
-            try:
-                obj, end = decoder.raw_decode(content[idx:])
-                idx += end
-                if isinstance(obj, dict) and "tool" in obj:
-                    tool_calls.append((obj["tool"], obj.get("args", {})))
-            except json.JSONDecodeError:
-                # Try repair on a candidate block
-                if content[idx:].strip().startswith('{"tool"'):
-                    # Naive brace counting to find end of block
-                    balance = 0
-                    start_idx = content.find('{', idx)
-                    if start_idx == -1:
-                        idx += 1
-                        continue
-                        
-                    found = False
-                    for i, char in enumerate(content[start_idx:], start=start_idx):
-                        if char == '{':
-                            balance += 1
-                        elif char == '}':
-                            balance -= 1
-                            if balance == 0:
-                                candidate = content[start_idx:i+1]
-                                try:
-                                    repaired = self._repair_json(candidate)
-                                    obj = json.loads(repaired)
-                                    if isinstance(obj, dict) and "tool" in obj:
-                                        tool_calls.append((obj["tool"], obj.get("args", {})))
-                                        idx = i + 1
-                                        found = True
-                                        break
-                                except:
-                                    pass
-                                break
-                    if not found:
-                        idx += 1
-                else:
-                    idx += 1
-
-        return tool_calls
+        scan = scan_tool_calls(content)
+        self._tool_call_errors = scan.errors
+        return scan.calls
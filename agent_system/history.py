@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+SUMMARY_PREFIX = "Previous Conversation Summary:"
+
+
+class HistorySummarizer:
+    """
+    Rolling, hierarchical summary of an agent's conversation.
+
+    Each compression summarizes only the newest unsummarized span and pushes it as a
+    level-0 segment. Whenever `fanout` segments of the same level accumulate they are
+    merged into one segment of the next level, so the summary stays bounded while
+    older detail is condensed gradually instead of being re-summarized every time.
+    Span and merge results are cached by content hash, so identical work is never
+    sent to the LLM twice (e.g. a span summarized in the background and again on
+    demand).
+    """
+
+    def __init__(self, provider, model: str, fanout: int = 4, max_cached: int = 256):
+        self.provider = provider
+        self.model = model
+        self.fanout = max(2, int(fanout))
+        self.max_cached = max(1, int(max_cached))
+        self.segments: List[Tuple[int, str]] = []
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key: str):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: str) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def _complete(self, instruction: str, text: str) -> str:
+        return self.provider.generate(
+            [
+                {"role": "system", "content": instruction},
+                {"role": "user", "content": text},
+            ],
+            model=self.model,
+        )
+
+    def summarize_span(self, messages: List[Dict[str, Any]]) -> str:
+        conversation_text = ""
+        for m in messages:
+            role = m.get("role", "unknown")
+            content = m.get("content") or ""
+            conversation_text += f"{role.upper()}: {content}\n\n"
+            for call in m.get("tool_calls") or []:
+                function = call.get("function", {})
+                conversation_text += f"{role.upper()} CALLED {function.get('name')}: {function.get('arguments')}\n\n"
+
+        key = "span:" + hashlib.sha256(conversation_text.encode("utf-8")).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        summary = self._complete(
+            "You are a helpful assistant. Summarize the following conversation history concisely, retaining key information, decisions, and current state. The summary will be used as context for future actions.",
+            f"Conversation to summarize:\n{conversation_text}",
+        )
+        self._store(key, summary)
+        return summary
+
+    def _merge(self, summaries: List[str]) -> str:
+        key = "merge:" + hashlib.sha256(json.dumps(summaries).encode("utf-8")).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        numbered = "\n\n".join(f"Part {i + 1}:\n{s}" for i, s in enumerate(summaries))
+        merged = self._complete(
+            "You are a helpful assistant. Merge the following consecutive summaries of one conversation (oldest first) into a single concise summary. Keep key information, decisions, file paths, and the current state; drop details that later parts supersede.",
+            numbered,
+        )
+        self._store(key, merged)
+        return merged
+
+    def add(self, summary: str) -> None:
+        """Appends the summary of the newest span and merges full levels upward."""
+        self.segments.append((0, summary))
+        while len(self.segments) >= self.fanout:
+            level = self.segments[-1][0]
+            tail = self.segments[-self.fanout:]
+            if any(seg_level != level for seg_level, _ in tail):
+                break
+            merged = self._merge([text for _, text in tail])
+            del self.segments[-self.fanout:]
+            self.segments.append((level + 1, merged))
+
+    def render(self) -> str:
+        return f"{SUMMARY_PREFIX}\n" + "\n\n".join(text for _, text in self.segments)
+
+    def reset(self) -> None:
+        self.segments = []
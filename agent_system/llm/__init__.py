@@ -1,2 +1,4 @@
 from .base import LLMProvider
 from .openai_like import OpenAILikeProvider
+from .async_openai_like import AsyncOpenAILikeProvider
+from .cache import CachedProvider, ResponseCache
@@ -0,0 +1,239 @@
+import asyncio
+import importlib.util
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Iterator, List, Dict, Optional
+import httpx
+from .openai_like import (
+    OpenAILikeProvider,
+    message_content,
+    parse_sse_line,
+    parse_tool_message,
+)
+
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional 'h2' package is installed.
+    return importlib.util.find_spec("h2") is not None
+
+
+class AsyncOpenAILikeProvider(OpenAILikeProvider):
+    """
+    OpenAI-compatible provider built on httpx.AsyncClient.
+
+    All requests run on one event loop owned by the provider (started lazily in a
+    daemon thread), so every caller - async code via agenerate(), or threads such
+    as concurrent Parliament reviews via generate() - shares a single bounded
+    connection pool.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        *,
+        timeout_s: float = 60.0,
+        max_retries: int = 3,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 6.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_s: float = 30.0,
+        http2: bool = True,
+        cache_breakpoints: Optional[bool] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max(1, int(max_connections)),
+            max_keepalive_connections=max(0, int(max_keepalive_connections)),
+            keepalive_expiry=float(keepalive_expiry_s),
+        )
+        self.http2 = bool(http2) and _http2_available()
+        self._timeout_s = float(timeout_s)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        super().__init__(
+            api_key,
+            base_url,
+            timeout_s=timeout_s,
+            max_retries=max_retries,
+            backoff_base_s=backoff_base_s,
+            backoff_max_s=backoff_max_s,
+            cache_breakpoints=cache_breakpoints,
+        )
+
+    def _create_client(self, timeout_s: float):
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(timeout_s),
+            limits=self.limits,
+            http2=self.http2,
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="llm-provider-loop",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop = loop
+                self._loop_thread = thread
+            return self._loop
+
+    async def _post(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        return await self._asend(self._build_payload(messages, model, **kwargs), message_content)
+
+    async def _post_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        payload = self._build_payload(messages, model, **kwargs)
+        payload["tools"] = tools
+        return await self._asend(payload, parse_tool_message)
+
+    async def _asend(self, payload: Dict, extract: Callable[[Dict[str, Any]], Any]) -> Any:
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                response = await self._client.post(url, json=payload)
+                response.raise_for_status()
+                data = response.json()
+                self.usage.record(data.get("usage"))
+                return extract(data)
+            except Exception as e:
+                await asyncio.sleep(self._retry_or_raise(attempt, e))
+
+    async def _run_on_loop(self, coro):
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            return await coro
+
+        # Hop onto the provider loop; cancelling the awaiting task cancels the request.
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return await asyncio.wrap_future(future)
+
+    def _run_blocking(self, coro):
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("generate() cannot block the provider event loop; await agenerate() instead.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def agenerate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        return await self._run_on_loop(self._post(messages, model, **kwargs))
+
+    def generate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        return self._run_blocking(self._post(messages, model, **kwargs))
+
+    async def agenerate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        return await self._run_on_loop(self._post_with_tools(messages, model, tools, **kwargs))
+
+    def generate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        return self._run_blocking(self._post_with_tools(messages, model, tools, **kwargs))
+
+    async def _stream_deltas(self, messages: List[Dict[str, str]], model: str, **kwargs) -> AsyncIterator[str]:
+        url = f"{self.base_url}/chat/completions"
+        payload = self._stream_payload(messages, model, **kwargs)
+
+        for attempt in range(1, self.max_retries + 1):
+            # Once content has been yielded the request can no longer be retried transparently.
+            emitted = False
+            try:
+                async with self._client.stream("POST", url, json=payload) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        done, delta, usage = parse_sse_line(line)
+                        if usage is not None:
+                            self.usage.record(usage)
+                        if done:
+                            return
+                        if delta:
+                            emitted = True
+                            yield delta
+                return
+            except Exception as e:
+                await asyncio.sleep(self._retry_or_raise(attempt, e, emitted))
+
+    async def _pump_stream(self, messages: List[Dict[str, str]], model: str, emit: Callable, **kwargs) -> None:
+        """Runs on the provider loop and forwards ("delta" | "error" | "end", value) events to emit."""
+        try:
+            async for delta in self._stream_deltas(messages, model, **kwargs):
+                emit(("delta", delta))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            emit(("error", e))
+            return
+        emit(("end", None))
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> AsyncIterator[str]:
+        loop = self._ensure_loop()
+        running = asyncio.get_running_loop()
+
+        if running is loop:
+            async for delta in self._stream_deltas(messages, model, **kwargs):
+                yield delta
+            return
+
+        events: asyncio.Queue = asyncio.Queue()
+
+        def emit(event):
+            running.call_soon_threadsafe(events.put_nowait, event)
+
+        future = asyncio.run_coroutine_threadsafe(self._pump_stream(messages, model, emit, **kwargs), loop)
+        try:
+            while True:
+                kind, value = await events.get()
+                if kind == "delta":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def stream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Iterator[str]:
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            raise RuntimeError("stream() cannot block the provider event loop; use astream() instead.")
+
+        events: queue.Queue = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._pump_stream(messages, model, events.put, **kwargs), loop)
+        try:
+            while True:
+                kind, value = events.get()
+                if kind == "delta":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def close(self) -> None:
+        """Closes the pooled connections and stops the provider event loop."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = None
+            self._loop_thread = None
+
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+        # Leave the provider usable: the next call starts a fresh loop and pool.
+        self._client = self._create_client(self._timeout_s)
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, AsyncIterator, Iterator, List, Dict
 
 class LLMProvider(ABC):
     @abstractmethod
@@ -15,3 +16,41 @@ class LLMProvider(ABC):
             The generated text content.
         """
         pass
+
+    async def agenerate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        """
+        Async counterpart of generate().
+
+        The default runs the blocking generate() in a worker thread; providers with a
+        native async transport override this.
+        """
+        return await asyncio.to_thread(self.generate, messages, model, **kwargs)
+
+    def generate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """
+        Generate with native function calling.
+
+        `tools` uses the OpenAI format ({"type": "function", "function": schema}). Returns
+        {"content": str, "tool_calls": [{"id", "name", "arguments", "raw_arguments"}]},
+        where "arguments" is the decoded dict (None if it was not valid JSON) and
+        "raw_arguments" the string the model sent. Providers without native tool
+        support raise NotImplementedError; callers fall back to prompt-embedded tools.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support native tool calls")
+
+    async def agenerate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Async counterpart of generate_with_tools()."""
+        return await asyncio.to_thread(self.generate_with_tools, messages, model, tools, **kwargs)
+
+    def stream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Iterator[str]:
+        """
+        Generate text incrementally, yielding content deltas as they arrive.
+
+        The default yields the full generate() result as a single chunk; providers
+        that support server-sent events override this.
+        """
+        yield self.generate(messages, model, **kwargs)
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> AsyncIterator[str]:
+        """Async counterpart of stream()."""
+        yield await self.agenerate(messages, model, **kwargs)
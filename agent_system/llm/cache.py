@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from .base import LLMProvider
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    """Stable hash of everything that determines a completion."""
+    blob = json.dumps(
+        {"model": model, "messages": messages, "kwargs": kwargs},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier completion cache: an in-memory LRU in front of an optional SQLite file.
+
+    Entries older than ttl_s are treated as misses and evicted; each tier is capped
+    by entry count (least recently used goes first). Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_s: Optional[float] = None,
+        path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s) if ttl_s and ttl_s > 0 else None
+        self.path = path
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            self._db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_s is not None and now - created > self.ttl_s
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._counters["evictions"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if not self._expired(created, now):
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, value, created)
+                        self._counters["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._counters["evictions"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_disk_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._counters["evictions"] += overflow
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+            return stats
+
+
+class CachedProvider(LLMProvider):
+    """
+    Wraps a provider and serves byte-identical requests from a ResponseCache.
+
+    Intended for the deterministic planning calls (should_plan, create_plan,
+    review_plan); the executing Agent should keep using the raw provider because
+    its tool results depend on the state of the file system.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: Optional[ResponseCache] = None):
+        self.provider = provider
+        self.cache = cache or ResponseCache()
+
+    def __getattr__(self, name):
+        # Expose the wrapped provider's extras (close(), base_url, ...).
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def generate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        key = cache_key(model, messages, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        content = self.provider.generate(messages, model, **kwargs)
+        self.cache.put(key, content)
+        return content
+
+    async def agenerate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        key = cache_key(model, messages, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        content = await self.provider.agenerate(messages, model, **kwargs)
+        self.cache.put(key, content)
+        return content
+
+    def generate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        # Tool-calling turns drive side effects; they are never served from cache.
+        return self.provider.generate_with_tools(messages, model, tools, **kwargs)
+
+    async def agenerate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        return await self.provider.agenerate_with_tools(messages, model, tools, **kwargs)
+
+    def stream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Iterator[str]:
+        key = cache_key(model, messages, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for delta in self.provider.stream(messages, model, **kwargs):
+            chunks.append(delta)
+            yield delta
+        self.cache.put(key, "".join(chunks))
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> AsyncIterator[str]:
+        key = cache_key(model, messages, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for delta in self.provider.astream(messages, model, **kwargs):
+            chunks.append(delta)
+            yield delta
+        self.cache.put(key, "".join(chunks))
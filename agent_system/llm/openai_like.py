@@ -1,9 +1,147 @@
 import httpx
+import json
+import os
 import random
+import threading
 import time
-from typing import List, Dict, Optional
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple, TypeVar
+from ..tool_calls import repair_json
 from .base import LLMProvider
 
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    if "retry-after" not in response.headers:
+        return None
+    try:
+        return float(response.headers["retry-after"])
+    except Exception:
+        return None
+
+
+def parse_sse_line(line: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Parses one server-sent-events line of a streamed chat completion.
+    Returns (done, content_delta, usage); non-content events yield an empty delta, and
+    usage is set only on the final chunk sent for stream_options.include_usage.
+    """
+    line = line.strip()
+    if not line.startswith("data:"):
+        return False, "", None
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return True, "", None
+    try:
+        event = json.loads(data)
+    except json.JSONDecodeError:
+        return False, "", None
+    usage = event.get("usage") or None
+    choices = event.get("choices") or []
+    if not choices:
+        return False, "", usage
+    delta = choices[0].get("delta") or {}
+    return False, delta.get("content") or "", usage
+
+
+def message_content(data: Dict[str, Any]) -> str:
+    return data["choices"][0]["message"]["content"]
+
+
+def parse_tool_message(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracts content and structured tool calls from a chat completion (see generate_with_tools)."""
+    message = data["choices"][0]["message"]
+    calls = []
+    for call in message.get("tool_calls") or []:
+        function = call.get("function") or {}
+        raw = function.get("arguments")
+        if isinstance(raw, dict):
+            arguments, raw = raw, json.dumps(raw)
+        else:
+            raw = raw or "{}"
+            try:
+                arguments = json.loads(raw)
+            except json.JSONDecodeError:
+                try:
+                    arguments = json.loads(repair_json(raw))
+                except json.JSONDecodeError:
+                    arguments = None
+        calls.append({
+            "id": call.get("id") or f"call_{len(calls)}",
+            "name": function.get("name", ""),
+            "arguments": arguments,
+            "raw_arguments": raw,
+        })
+    return {"content": message.get("content") or "", "tool_calls": calls}
+
+
+def cached_prompt_tokens(usage: Dict[str, Any]) -> int:
+    """Prompt tokens served from the provider's prompt cache, in either OpenAI or Anthropic style."""
+    details = usage.get("prompt_tokens_details") or {}
+    return int(details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0)
+
+
+class UsageStats:
+    """Token totals summed over the `usage` field of every completed request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, usage: Optional[Dict[str, Any]]) -> None:
+        if not isinstance(usage, dict):
+            return
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.cached_tokens += cached_prompt_tokens(usage)
+            self.completion_tokens += int(usage.get("completion_tokens") or 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def _with_cache_control(message: Dict[str, Any]) -> Dict[str, Any]:
+    content = message.get("content")
+    if isinstance(content, str):
+        parts = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content:
+        parts = [dict(part) for part in content]
+    else:
+        return message
+    parts[-1]["cache_control"] = {"type": "ephemeral"}
+    return {**message, "content": parts}
+
+
+def mark_cache_breakpoints(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Marks the end of the system prompt and the end of everything before the last
+    message as cache breakpoints. Callers put the part that varies between calls
+    last, so the marked prefix is byte-identical across calls and can be cached.
+    """
+    marked = list(messages)
+    positions = {len(marked) - 2}
+    for i, message in enumerate(marked):
+        if message.get("role") == "system":
+            positions.add(i)
+            break
+    for i in positions:
+        if 0 <= i < len(marked) - 1:
+            marked[i] = _with_cache_control(marked[i])
+    return marked
+
+
 class OpenAILikeProvider(LLMProvider):
     def __init__(
         self,
@@ -14,17 +152,26 @@ class OpenAILikeProvider(LLMProvider):
         max_retries: int = 3,
         backoff_base_s: float = 0.5,
         backoff_max_s: float = 6.0,
+        cache_breakpoints: Optional[bool] = None,
     ):
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self.max_retries = max(1, int(max_retries))
         self.backoff_base_s = float(backoff_base_s)
         self.backoff_max_s = float(backoff_max_s)
+        # For endpoints with explicit prompt caching (cache_control markers, e.g. Anthropic-compatible ones).
+        if cache_breakpoints is None:
+            cache_breakpoints = os.getenv("AI_CONGRESS_CACHE_BREAKPOINTS", "0") == "1"
+        self.cache_breakpoints = bool(cache_breakpoints)
+        self.usage = UsageStats()
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        self._client = httpx.Client(
+        self._client = self._create_client(timeout_s)
+
+    def _create_client(self, timeout_s: float):
+        return httpx.Client(
             headers=self.headers,
             timeout=httpx.Timeout(timeout_s),
         )
@@ -36,46 +183,80 @@ class OpenAILikeProvider(LLMProvider):
         jitter = random.uniform(0.0, 0.25)
         return max(0.0, min(self.backoff_max_s, base + jitter))
 
-    def generate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
-        url = f"{self.base_url}/chat/completions"
+    def _retry_or_raise(self, attempt: int, error: Exception, emitted: bool = False) -> float:
+        """
+        The retry policy shared by every request path (sync, async, streamed): returns the
+        delay before the next attempt, or raises the provider error for `error` when it is
+        not retryable or attempts ran out. A stream that has already yielded content
+        cannot be retried transparently, so transport errors are then raised as well.
+        """
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                return self._retry_delay(attempt, retry_after_s=parse_retry_after(error.response))
+            raise Exception(f"HTTP error {status}: {error.response.text}")
+        if isinstance(error, (httpx.TimeoutException, httpx.RequestError)) and attempt < self.max_retries and not emitted:
+            return self._retry_delay(attempt)
+        raise Exception(f"Error communicating with LLM provider: {str(error)}")
+
+    def _build_payload(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Dict:
+        if self.cache_breakpoints:
+            messages = mark_cache_breakpoints(messages)
         payload = {
             "model": model,
             "messages": messages
         }
         payload.update(kwargs)
-        
-        retryable_statuses = {408, 429, 500, 502, 503, 504}
-        last_err: Optional[Exception] = None
+        return payload
+
+    def _stream_payload(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Dict:
+        payload = self._build_payload(messages, model, **kwargs)
+        payload["stream"] = True
+        # Ask for a final chunk carrying the token usage, so streamed calls are counted too.
+        payload.setdefault("stream_options", {"include_usage": True})
+        return payload
 
+    def _send(self, payload: Dict, extract: Callable[[Dict[str, Any]], T]) -> T:
+        url = f"{self.base_url}/chat/completions"
         for attempt in range(1, self.max_retries + 1):
             try:
                 response = self._client.post(url, json=payload)
                 response.raise_for_status()
                 data = response.json()
-                return data["choices"][0]["message"]["content"]
-            except httpx.HTTPStatusError as e:
-                status = e.response.status_code
-                body = e.response.text
-
-                retry_after = None
-                if "retry-after" in e.response.headers:
-                    try:
-                        retry_after = float(e.response.headers["retry-after"])
-                    except Exception:
-                        retry_after = None
-
-                last_err = Exception(f"HTTP error {status}: {body}")
-                if status in retryable_statuses and attempt < self.max_retries:
-                    time.sleep(self._retry_delay(attempt, retry_after_s=retry_after))
-                    continue
-                raise last_err
-            except (httpx.TimeoutException, httpx.RequestError) as e:
-                last_err = Exception(f"Error communicating with LLM provider: {str(e)}")
-                if attempt < self.max_retries:
-                    time.sleep(self._retry_delay(attempt))
-                    continue
-                raise last_err
+                self.usage.record(data.get("usage"))
+                return extract(data)
             except Exception as e:
-                raise Exception(f"Error communicating with LLM provider: {str(e)}")
+                time.sleep(self._retry_or_raise(attempt, e))
+
+    def generate(self, messages: List[Dict[str, str]], model: str, **kwargs) -> str:
+        return self._send(self._build_payload(messages, model, **kwargs), message_content)
 
-        raise last_err or Exception("Error communicating with LLM provider: unknown error")
+    def generate_with_tools(self, messages: List[Dict[str, Any]], model: str, tools: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        payload = self._build_payload(messages, model, **kwargs)
+        payload["tools"] = tools
+        return self._send(payload, parse_tool_message)
+
+    def stream(self, messages: List[Dict[str, str]], model: str, **kwargs) -> Iterator[str]:
+        url = f"{self.base_url}/chat/completions"
+        payload = self._stream_payload(messages, model, **kwargs)
+
+        for attempt in range(1, self.max_retries + 1):
+            # Once content has been yielded the request can no longer be retried transparently.
+            emitted = False
+            try:
+                with self._client.stream("POST", url, json=payload) as response:
+                    if response.status_code >= 400:
+                        response.read()
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        done, delta, usage = parse_sse_line(line)
+                        if usage is not None:
+                            self.usage.record(usage)
+                        if done:
+                            return
+                        if delta:
+                            emitted = True
+                            yield delta
+                return
+            except Exception as e:
+                time.sleep(self._retry_or_raise(attempt, e, emitted))
@@ -0,0 +1,136 @@
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+def _content_chars(message: Dict[str, Any]) -> int:
+    return len(str(message.get("content", "")))
+
+
+class MessageStore:
+    """
+    Conversation history that keeps its own bookkeeping up to date.
+
+    A running size total and a sorted index of tool-output positions are updated on
+    every append/delete/content change, so context-limit checks never rescan the
+    whole history.
+    """
+
+    def __init__(
+        self,
+        is_tool_output: Callable[[Dict[str, Any]], bool],
+        measure: Callable[[Dict[str, Any]], int] = _content_chars,
+        messages: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self._is_tool_output = is_tool_output
+        self._measure = measure
+        self._messages: List[Dict[str, Any]] = []
+        self._sizes: List[int] = []
+        self._total = 0
+        self._tool_positions: List[int] = []
+        if messages:
+            self.replace(messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._messages)
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self._messages[index]
+
+    def __delitem__(self, index: int) -> None:
+        index = self._normalize(index)
+        del self._messages[index]
+        self._total -= self._sizes.pop(index)
+
+        pos = bisect_left(self._tool_positions, index)
+        if pos < len(self._tool_positions) and self._tool_positions[pos] == index:
+            del self._tool_positions[pos]
+        for i in range(pos, len(self._tool_positions)):
+            self._tool_positions[i] -= 1
+
+    def delete_range(self, start: int, end: int) -> None:
+        """Deletes messages[start:end] in one pass."""
+        start = max(0, start)
+        end = min(len(self._messages), end)
+        if start >= end:
+            return
+        removed = end - start
+        del self._messages[start:end]
+        self._total -= sum(self._sizes[start:end])
+        del self._sizes[start:end]
+
+        lo = bisect_left(self._tool_positions, start)
+        hi = bisect_left(self._tool_positions, end)
+        self._tool_positions[lo:] = [p - removed for p in self._tool_positions[hi:]]
+
+    def insert(self, index: int, message: Dict[str, Any]) -> None:
+        index = max(0, min(len(self._messages), index))
+        size = self._measure(message)
+        self._messages.insert(index, message)
+        self._sizes.insert(index, size)
+        self._total += size
+
+        pos = bisect_left(self._tool_positions, index)
+        for i in range(pos, len(self._tool_positions)):
+            self._tool_positions[i] += 1
+        if self._is_tool_output(message):
+            self._tool_positions.insert(pos, index)
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += len(self._messages)
+        if not 0 <= index < len(self._messages):
+            raise IndexError("message index out of range")
+        return index
+
+    @property
+    def total_size(self) -> int:
+        """Sum of measure(message) over the whole history."""
+        return self._total
+
+    def size_of(self, index: int) -> int:
+        return self._sizes[self._normalize(index)]
+
+    def append(self, message: Dict[str, Any]) -> None:
+        size = self._measure(message)
+        self._messages.append(message)
+        self._sizes.append(size)
+        self._total += size
+        if self._is_tool_output(message):
+            self._tool_positions.append(len(self._messages) - 1)
+
+    def set_content(self, index: int, content: Any) -> None:
+        index = self._normalize(index)
+        message = self._messages[index]
+        was_tool_output = self._is_tool_output(message)
+        message["content"] = content
+        size = self._measure(message)
+        self._total += size - self._sizes[index]
+        self._sizes[index] = size
+
+        is_tool_output = self._is_tool_output(message)
+        if was_tool_output and not is_tool_output:
+            self._tool_positions.remove(index)
+        elif is_tool_output and not was_tool_output:
+            insort(self._tool_positions, index)
+
+    def replace(self, messages: List[Dict[str, Any]]) -> None:
+        self._messages = []
+        self._sizes = []
+        self._total = 0
+        self._tool_positions = []
+        for message in messages:
+            self.append(message)
+
+    def tool_output_positions(self) -> List[int]:
+        return list(self._tool_positions)
+
+    def first_tool_output(self, start: int = 0) -> Optional[int]:
+        pos = bisect_left(self._tool_positions, start)
+        return self._tool_positions[pos] if pos < len(self._tool_positions) else None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Shallow copy suitable for handing to a provider."""
+        return list(self._messages)
@@ -1,3 +1,5 @@
 from .deputy import Deputy
 from .president import President
 from .parliament import Parliament
+from .plan_store import PlanStore
+from .triage import Triage
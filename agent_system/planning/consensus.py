@@ -0,0 +1,131 @@
+import os
+from typing import Dict, Optional
+
+
+class ConsensusPolicy:
+    """
+    Decides a voting round from a running tally.
+
+    `decide` receives the summed weights of YES votes, NO votes and reviews still
+    pending (deputies that errored or abstained count in none of them). It returns
+    True (approved) or False (rejected) once no pending vote can change the outcome,
+    and None while it is still open, which lets Parliament stop waiting early.
+    """
+
+    name = "policy"
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(weights or {})
+
+    def weight(self, deputy_name: str) -> float:
+        return float(self.weights.get(deputy_name, 1.0))
+
+    def decide(self, yes: float, no: float, pending: float) -> Optional[bool]:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+
+class UnanimousPolicy(ConsensusPolicy):
+    """Every valid vote must be YES; the first NO rejects the round."""
+
+    name = "unanimous"
+
+    def decide(self, yes: float, no: float, pending: float) -> Optional[bool]:
+        if no > 0:
+            return False
+        if pending <= 0:
+            return True
+        return None
+
+
+class WeightedPolicy(ConsensusPolicy):
+    """Approves when the YES weight exceeds `threshold` of the weight of all valid votes."""
+
+    name = "weighted"
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, threshold: float = 0.5):
+        super().__init__(weights)
+        if not 0.0 <= threshold < 1.0:
+            raise ValueError("threshold must be in [0, 1)")
+        self.threshold = float(threshold)
+
+    def decide(self, yes: float, no: float, pending: float) -> Optional[bool]:
+        needed = self.threshold * (yes + no + pending)
+        if yes > needed:
+            return True
+        if yes + pending <= needed:
+            return False
+        return None
+
+    def describe(self) -> str:
+        return f"{self.name} (> {self.threshold:g} of the vote weight)"
+
+
+class MajorityPolicy(WeightedPolicy):
+    """More than half of the valid votes, one vote per deputy."""
+
+    name = "majority"
+
+    def __init__(self):
+        super().__init__(None, 0.5)
+
+    def describe(self) -> str:
+        return self.name
+
+
+class QuorumPolicy(ConsensusPolicy):
+    """Approves once `quorum` deputies vote YES; rejects when that can no longer happen."""
+
+    name = "quorum"
+
+    def __init__(self, quorum: int):
+        super().__init__()
+        self.quorum = max(1, int(quorum))
+
+    def decide(self, yes: float, no: float, pending: float) -> Optional[bool]:
+        if yes >= self.quorum:
+            return True
+        if yes + pending < self.quorum:
+            return False
+        return None
+
+    def describe(self) -> str:
+        return f"{self.name} of {self.quorum}"
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parses "Architect=2,Security=1.5" into a name -> weight mapping."""
+    weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.rsplit("=", 1)
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return weights
+
+
+def policy_from_env() -> ConsensusPolicy:
+    """
+    Builds the policy named by AI_CONGRESS_CONSENSUS: "unanimous" (default), "majority",
+    "weighted" (AI_CONGRESS_DEPUTY_WEIGHTS, AI_CONGRESS_CONSENSUS_THRESHOLD) or
+    "quorum" (AI_CONGRESS_QUORUM, default 2). "quorum:3" is accepted as a shorthand.
+    """
+    spec = os.getenv("AI_CONGRESS_CONSENSUS", "unanimous").strip().lower()
+    kind, _, arg = spec.partition(":")
+    if kind == "majority":
+        return MajorityPolicy()
+    if kind == "weighted":
+        return WeightedPolicy(
+            parse_weights(os.getenv("AI_CONGRESS_DEPUTY_WEIGHTS", "")),
+            float(arg or os.getenv("AI_CONGRESS_CONSENSUS_THRESHOLD", "0.5")),
+        )
+    if kind == "quorum":
+        return QuorumPolicy(int(arg or os.getenv("AI_CONGRESS_QUORUM", "2")))
+    if kind != "unanimous":
+        raise ValueError(f"Unknown consensus policy: {spec!r}")
+    return UnanimousPolicy()
@@ -1,5 +1,8 @@
 import json
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Tuple, Union
+from ..toolset import ToolSet, tools_description as describe_tools
+from .plan import Plan, PlanDiff
 
 class Deputy:
     def __init__(self, name: str, model: str, persona: str, provider):
@@ -7,10 +10,14 @@ class Deputy:
         self.model = model
         self.persona = persona
         self.provider = provider
+        self._system_prompts: Dict[str, str] = {}
 
-    def review_plan(self, plan: str, objective: str, tools_description: str) -> Dict[str, Any]:
-        content = ""
-        system_prompt = (
+    def _system_prompt(self, tools_text: str) -> str:
+        """Persona, rules and tools: identical for every review, so providers can cache the prefix."""
+        prompt = self._system_prompts.get(tools_text)
+        if prompt is not None:
+            return prompt
+        prompt = (
             f"You are {self.name}, a Deputy in the AI Parliament.\n"
             f"Your Persona: {self.persona}\n\n"
             "Your Goal: Review the proposed plan to achieve the Objective using the available Tools.\n"
@@ -21,37 +28,113 @@ class Deputy:
             "{\n"
             '  "vote": true/false,\n'
             '  "note": "Concise feedback here"\n'
-            "}"
+            "}\n\n"
+            f"Available Tools:\n{tools_text}"
         )
+        self._system_prompts[tools_text] = prompt
+        return prompt
+
+    def review_plan(self, plan: str, objective: str, tools_description: Union[str, ToolSet]) -> Dict[str, Any]:
+        return self._vote(*self._plan_request(plan, objective, tools_description))
+
+    async def areview_plan(self, plan: str, objective: str, tools_description: Union[str, ToolSet]) -> Dict[str, Any]:
+        """Async counterpart of review_plan(), via the provider's agenerate()."""
+        return await self._avote(*self._plan_request(plan, objective, tools_description))
+
+    def review_changes(
+        self,
+        plan: Plan,
+        changes: PlanDiff,
+        previous: Dict[str, Any],
+        objective: str,
+        tools_description: Union[str, ToolSet],
+    ) -> Dict[str, Any]:
+        """Re-reviews only the steps that changed since this deputy's previous verdict."""
+        return self._vote(*self._changes_request(plan, changes, previous, objective, tools_description))
+
+    async def areview_changes(
+        self,
+        plan: Plan,
+        changes: PlanDiff,
+        previous: Dict[str, Any],
+        objective: str,
+        tools_description: Union[str, ToolSet],
+    ) -> Dict[str, Any]:
+        """Async counterpart of review_changes()."""
+        return await self._avote(*self._changes_request(plan, changes, previous, objective, tools_description))
+
+    def _plan_request(self, plan: str, objective: str, tools_description: Union[str, ToolSet]) -> Tuple[str, str, str]:
+        system_prompt = self._system_prompt(describe_tools(tools_description))
 
+        # Static parts first and the plan last: across rounds only the final message changes,
+        # so the system prompt and objective form a prefix providers can serve from cache.
         user_message = (
-            f"Objective: {objective}\n\n"
-            f"Available Tools:\n{tools_description}\n\n"
             f"Proposed Plan:\n{plan}\n\n"
             "Please review and vote."
         )
 
+        return system_prompt, objective, user_message
+
+    def _changes_request(
+        self,
+        plan: Plan,
+        changes: PlanDiff,
+        previous: Dict[str, Any],
+        objective: str,
+        tools_description: Union[str, ToolSet],
+    ) -> Tuple[str, str, str]:
+        system_prompt = self._system_prompt(describe_tools(tools_description))
+        verdict = "YES" if previous.get("vote") else "NO"
+        user_message = (
+            f"Your previous verdict: {verdict} | Note: {previous.get('note', 'No comment')}\n\n"
+            f"Unchanged steps (already reviewed):\n{plan.outline([s.id for s in changes.unchanged]) or '(none)'}\n\n"
+            f"Changes since then:\n{changes.to_compact()}\n\n"
+            "Please review the changes and vote on the plan as a whole."
+        )
+        return system_prompt, objective, user_message
+
+    @staticmethod
+    def _messages(system_prompt: str, objective: str, user_message: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Objective: {objective}"},
+            {"role": "user", "content": user_message}
+        ]
+
+    def _vote(self, system_prompt: str, objective: str, user_message: str) -> Dict[str, Any]:
+        content = ""
         try:
             content = self.provider.generate(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
+                messages=self._messages(system_prompt, objective, user_message),
                 model=self.model,
                 max_tokens=1000
             )
-            
-            # Debug: Print raw content
-            # print(f"\n[DEBUG] Deputy {self.name} Raw Output:\n{content}\n[END DEBUG]\n")
-
-            # Robust JSON extraction using regex
-            import re
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                return json.loads(json_str)
-            
-            # Fallback if no JSON found (or try parsing the whole thing)
-            return json.loads(content)
+            return self._parse_vote(content)
         except Exception as e:
             return {"error": f"Error during review: {str(e)} | Content: {content[:100]}..."}
+
+    async def _avote(self, system_prompt: str, objective: str, user_message: str) -> Dict[str, Any]:
+        content = ""
+        try:
+            content = await self.provider.agenerate(
+                messages=self._messages(system_prompt, objective, user_message),
+                model=self.model,
+                max_tokens=1000
+            )
+            return self._parse_vote(content)
+        except Exception as e:
+            return {"error": f"Error during review: {str(e)} | Content: {content[:100]}..."}
+
+    @staticmethod
+    def _parse_vote(content: str) -> Dict[str, Any]:
+        # Debug: Print raw content
+        # print(f"\n[DEBUG] Deputy Raw Output:\n{content}\n[END DEBUG]\n")
+
+        # Robust JSON extraction using regex
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if match:
+            json_str = match.group(0)
+            return json.loads(json_str)
+
+        # Fallback if no JSON found (or try parsing the whole thing)
+        return json.loads(content)
@@ -1,12 +1,50 @@
-from typing import List, Tuple
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from ..toolset import ToolSet
+from .consensus import ConsensusPolicy, policy_from_env
 from .deputy import Deputy
+from .plan import Plan
+from .plan_store import PlanStore, workspace_fingerprint
 from .president import President
 
 class Parliament:
-    def __init__(self, president: President, deputies: List[Deputy], ui=None):
+    def __init__(
+        self,
+        president: President,
+        deputies: List[Deputy],
+        ui=None,
+        *,
+        max_concurrency: Optional[int] = None,
+        deputy_timeout_s: Optional[float] = None,
+        policy: Optional[ConsensusPolicy] = None,
+        speculative_revision: Optional[bool] = None,
+        plan_store: Optional[PlanStore] = None,
+        structured: Optional[bool] = None,
+    ):
         self.president = president
         self.deputies = deputies
         self.ui = ui
+        self.policy = policy or policy_from_env()
+        # Start revising on the first NO vote while the other deputies are still reviewing.
+        if speculative_revision is None:
+            speculative_revision = os.getenv("AI_CONGRESS_SPECULATIVE_REVISION", "0") == "1"
+        self.speculative_revision = bool(speculative_revision)
+        self.plan_store = plan_store
+        # Structured plans: step ids, step-level revisions, and deputies re-review only changed steps.
+        if structured is None:
+            structured = os.getenv("AI_CONGRESS_STRUCTURED_PLANS", "0") == "1"
+        self.structured = bool(structured)
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("AI_CONGRESS_PARLIAMENT_CONCURRENCY", "4"))
+        if deputy_timeout_s is None:
+            deputy_timeout_s = float(os.getenv("AI_CONGRESS_DEPUTY_TIMEOUT_S", "120"))
+        self.max_concurrency = max(1, int(max_concurrency))
+        # A non-positive timeout disables the per-deputy deadline.
+        self.deputy_timeout_s = float(deputy_timeout_s) if deputy_timeout_s and deputy_timeout_s > 0 else None
 
     def _log(self, message, style=None):
         if self.ui:
@@ -14,77 +52,403 @@ class Parliament:
         else:
             print(message)
 
-    def conduct_session(self, objective: str, tools_description: str) -> str:
+    def _tally(self, reviews: List[Optional[Dict[str, Any]]]) -> Tuple[float, float, float]:
+        """(yes, no, pending) vote weights; errors, abstentions and skipped reviews count in none."""
+        yes = no = pending = 0.0
+        for deputy, review in zip(self.deputies, reviews):
+            weight = self.policy.weight(deputy.name)
+            if review is None:
+                pending += weight
+            elif "abstain" in review or "error" in review or "skipped" in review:
+                continue
+            elif review.get("vote", False):
+                yes += weight
+            else:
+                no += weight
+        return yes, no, pending
+
+    def _decided(self, reviews: List[Optional[Dict[str, Any]]]) -> bool:
+        yes, no, pending = self._tally(reviews)
+        if pending <= 0 or yes + no <= 0:
+            return False
+        return self.policy.decide(yes, no, pending) is not None
+
+    def _feedback(self, reviews: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Feedback entries of the valid votes received so far, in deputy order."""
+        feedback = []
+        for deputy, review in zip(self.deputies, reviews):
+            if review is None or "abstain" in review or "error" in review or "skipped" in review:
+                continue
+            feedback.append({"deputy": deputy.name, "note": review.get("note", "No comment"), "vote": review.get("vote", False)})
+        return feedback
+
+    def _collect_reviews(
+        self,
+        plan: str,
+        objective: str,
+        tools_description: Union[str, ToolSet],
+        on_review: Optional[Callable[[List[Optional[Dict[str, Any]]]], None]] = None,
+        review_call: Optional[Callable[[int, Deputy], Awaitable[Dict[str, Any]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs every deputy review concurrently (bounded by max_concurrency) on a private
+        event loop, through each provider's agenerate(): one shared connection pool for
+        AsyncOpenAILikeProvider, worker threads for blocking providers.
+        Returns one review per deputy, in deputy order. A deputy that exceeds
+        deputy_timeout_s is reported as {"abstain": "..."} instead of blocking the round.
+        The round as a whole gets deputy_timeout_s per wave of max_concurrency reviews,
+        so reviews stuck in the queue behind a hung one abstain as well.
+        Once the consensus policy can decide the round, the remaining reviews are
+        cancelled and reported as {"skipped": "..."}.
+        `on_review` is called with the partial results each time reviews complete;
+        `review_call(index, deputy)` returns the coroutine that replaces the default full review of `plan`.
+        """
+        if not self.deputies:
+            return []
+
+        workers = min(self.max_concurrency, len(self.deputies))
+        loop = asyncio.new_event_loop()
+        # Blocking providers run here, one thread per deputy so a review that timed out (and
+        # still holds its thread) cannot delay the next; close() below does not wait for it.
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=len(self.deputies), thread_name_prefix="deputy-review"))
+        try:
+            return loop.run_until_complete(
+                self._gather_reviews(plan, objective, tools_description, workers, on_review, review_call)
+            )
+        finally:
+            loop.close()
+
+    async def _gather_reviews(
+        self,
+        plan: str,
+        objective: str,
+        tools_description: Union[str, ToolSet],
+        workers: int,
+        on_review: Optional[Callable[[List[Optional[Dict[str, Any]]]], None]],
+        review_call: Optional[Callable[[int, Deputy], Awaitable[Dict[str, Any]]]],
+    ) -> List[Dict[str, Any]]:
+        reviews: List[Optional[Dict[str, Any]]] = [None] * len(self.deputies)
+        started: Dict[int, float] = {}
+        slots = asyncio.Semaphore(workers)
+
+        async def review(index: int, deputy: Deputy) -> Dict[str, Any]:
+            async with slots:
+                started[index] = time.monotonic()
+                if review_call is not None:
+                    call = review_call(index, deputy)
+                else:
+                    call = deputy.areview_plan(plan, objective, tools_description)
+                try:
+                    return await asyncio.wait_for(call, self.deputy_timeout_s)
+                except asyncio.TimeoutError:
+                    return {"abstain": f"No response within {self.deputy_timeout_s:g}s"}
+
+        round_deadline = None
+        if self.deputy_timeout_s is not None:
+            waves = -(-len(self.deputies) // workers)
+            round_deadline = time.monotonic() + self.deputy_timeout_s * waves
+
+        tasks = {asyncio.ensure_future(review(i, d)): i for i, d in enumerate(self.deputies)}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None
+                if round_deadline is not None:
+                    timeout = max(0.0, round_deadline - time.monotonic())
+
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    index = tasks[task]
+                    try:
+                        reviews[index] = task.result()
+                    except Exception as e:
+                        reviews[index] = {"error": f"Error during review: {str(e)}"}
+                if on_review is not None and done:
+                    on_review(list(reviews))
+
+                if pending and self._decided(reviews):
+                    for task in pending:
+                        reviews[tasks[task]] = {"skipped": "Outcome already decided"}
+                    break
+
+                now = time.monotonic()
+                if round_deadline is not None and now >= round_deadline:
+                    for task in pending:
+                        index = tasks[task]
+                        if index not in started:
+                            reason = "Review did not start before the round's deadline"
+                        elif now - started[index] >= self.deputy_timeout_s:
+                            reason = f"No response within {self.deputy_timeout_s:g}s"
+                        else:
+                            reason = "Round deadline reached"
+                        reviews[index] = {"abstain": reason}
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return [r if r is not None else {"error": "Error during review: no result"} for r in reviews]
+
+    def _usage_snapshot(self) -> Dict[str, int]:
+        """Token usage summed over the distinct providers of the President and Deputies."""
+        totals: Dict[str, int] = {}
+        seen = set()
+        for member in [self.president, *self.deputies]:
+            usage = getattr(member.provider, "usage", None)
+            if usage is None or not hasattr(usage, "snapshot") or id(usage) in seen:
+                continue
+            seen.add(id(usage))
+            for key, value in usage.snapshot().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def conduct_session(self, objective: str, tools_description: Union[str, ToolSet]) -> str:
+        before = self._usage_snapshot()
+        try:
+            return self._conduct_session(objective, tools_description)
+        finally:
+            after = self._usage_snapshot()
+            prompt_tokens = after.get("prompt_tokens", 0) - before.get("prompt_tokens", 0)
+            if prompt_tokens > 0:
+                cached = after.get("cached_tokens", 0) - before.get("cached_tokens", 0)
+                self._log(
+                    f"[dim]Session prompt tokens: {prompt_tokens} ({cached} served from the provider's prompt cache)[/dim]"
+                )
+
+    def _speculate(self, executor: ThreadPoolExecutor, plan: Union[str, Plan], objective: str, reviews, speculation: Dict[str, Any]) -> None:
+        """
+        Keeps a revision running that covers every NO vote received so far. The first
+        objection starts revise_plan; a later one is merged into a finished revision
+        (revised again with just the new objections) or restarts an unfinished one.
+        """
+        feedback = self._feedback(reviews)
+        objections = [f for f in feedback if not f["vote"]]
+        covered = speculation.get("feedback", [])
+        later = [f for f in objections if f not in covered]
+        if not later:
+            return
+        future = speculation.get("future")
+        if future is not None and future.done() and future.exception() is None:
+            speculation["future"] = executor.submit(self._revise_fn, future.result(), later, objective)
+        else:
+            if future is not None:
+                future.cancel()
+            speculation["future"] = executor.submit(self._revise_fn, plan, feedback, objective)
+        speculation["feedback"] = feedback
+
+    def _revise(self, plan: Union[str, Plan], feedback_list: List[Dict[str, Any]], objective: str, speculation: Dict[str, Any]) -> str:
+        """Revises the plan, reusing the speculative revision when it covers every objection."""
+        future = speculation.get("future")
+        if future is not None:
+            covered = speculation["feedback"]
+            if all(f["vote"] or f in covered for f in feedback_list):
+                try:
+                    revised = future.result()
+                    self._log("[dim]Using the revision started while deputies were still voting.[/dim]")
+                    return revised
+                except Exception:
+                    pass
+            else:
+                future.cancel()
+        return self._revise_fn(plan, feedback_list, objective)
+
+    @property
+    def _revise_fn(self) -> Callable:
+        return self.president.revise_structured_plan if self.structured else self.president.revise_plan
+
+    @staticmethod
+    def _render(plan: Union[str, Plan]) -> str:
+        return plan.to_markdown() if isinstance(plan, Plan) else plan
+
+    def _plan_scope(self, tools_description: Union[str, ToolSet]) -> str:
+        if isinstance(tools_description, ToolSet):
+            digest = tools_description.digest
+        else:
+            digest = hashlib.sha256(tools_description.encode("utf-8")).hexdigest()[:16]
+        return PlanStore.scope(digest, workspace_fingerprint(os.getcwd()))
+
+    def recall(self, objective: str, tools_description: Union[str, ToolSet]) -> Optional[str]:
+        """A previously approved plan for this objective, tool set and workspace, if stored."""
+        if self.plan_store is None:
+            return None
+        return self.plan_store.get(objective, self._plan_scope(tools_description))
+
+    def _conduct_session(self, objective: str, tools_description: Union[str, ToolSet]) -> str:
+        scope = draft = None
+        if self.plan_store is not None:
+            scope = self._plan_scope(tools_description)
+            stored = self.plan_store.get(objective, scope)
+            if stored is not None:
+                self._log("[bold green]Reusing the plan approved earlier for this objective.[/bold green]")
+                return stored
+            similar = self.plan_store.find_similar(objective, scope)
+            if similar is not None:
+                previous_objective, draft, score = similar
+                self._log(f"[dim]Starting from the plan approved for a similar objective ({score:.0%}): {previous_objective}[/dim]")
+
+        revision_executor = None
+        if self.speculative_revision:
+            # Two workers: an abandoned speculation must not delay the next round's.
+            revision_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-revision")
+        try:
+            plan, approved = self._run_rounds(objective, tools_description, revision_executor, draft)
+            plan = self._render(plan)
+            if approved and self.plan_store is not None:
+                self.plan_store.put(objective, scope, plan)
+            return plan
+        finally:
+            if revision_executor is not None:
+                revision_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _show_plan(self, title: str, plan: Union[str, Plan]) -> None:
+        if self.ui:
+            self.ui.print_plan(title, self._render(plan))
+        else:
+            self._log(f"\n[bold cyan][{title}]:[/bold cyan]\n{self._render(plan)}\n")
+
+    def _vote_round(
+        self,
+        round_num: Optional[int],
+        current_plan: Union[str, Plan],
+        objective: str,
+        tools_description: Union[str, ToolSet],
+        verdicts: Dict[int, Tuple[Plan, Dict[str, Any]]],
+        on_review: Optional[Callable[[List[Optional[Dict[str, Any]]]], None]] = None,
+    ) -> Tuple[Optional[bool], List[Dict[str, Any]]]:
+        """
+        Holds one vote on current_plan (round_num None: a draft's confirmation round).
+        Returns (approved, feedback); approved is None when no deputy cast a valid vote.
+        """
+        if round_num is None:
+            self._log("[bold magenta]--- Confirmation Round of Voting ---[/bold magenta]")
+        elif self.ui:
+            self.ui.print_parliament_header(round_num)
+        else:
+            self._log(f"[bold magenta]--- Round {round_num} of Voting ---[/bold magenta]")
+
+        feedback_list = []
+
+        # Deputies vote (concurrently; rendered in deputy order)
+        valid_votes = 0
+        yes_votes = 0
+
+        review_call = None
+        if self.structured:
+            def review_call(index: int, deputy: Deputy, plan=current_plan) -> Awaitable[Dict[str, Any]]:
+                if index in verdicts:
+                    reviewed_plan, previous = verdicts[index]
+                    return deputy.areview_changes(plan, reviewed_plan.diff(plan), previous, objective, tools_description)
+                return deputy.areview_plan(plan.to_compact(), objective, tools_description)
+
+        reviews = self._collect_reviews(self._render(current_plan), objective, tools_description, on_review, review_call)
+        if self.structured:
+            for index, review in enumerate(reviews):
+                if "vote" in review and not ({"abstain", "error", "skipped"} & review.keys()):
+                    verdicts[index] = (current_plan, review)
+
+        for deputy, review in zip(self.deputies, reviews):
+            if "skipped" in review:
+                self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: [dim]SKIPPED | {review['skipped']}[/dim]")
+                continue
+
+            if "abstain" in review:
+                self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: [bold yellow]ABSTAIN[/bold yellow] | {review['abstain']}")
+                continue
+
+            if "error" in review:
+                self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: [bold red]ERROR[/bold red] | {review['error']}")
+                continue
+
+            vote = review.get("vote", False)
+            note = review.get("note", "No comment")
+
+            valid_votes += 1
+            if vote:
+                yes_votes += 1
+
+            feedback_list.append({"deputy": deputy.name, "note": note, "vote": vote})
+
+            if self.ui:
+                self.ui.print_deputy_vote(deputy.name, vote, note)
+            else:
+                status = "[bold green]YES[/bold green]" if vote else "[bold red]NO[/bold red]"
+                self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: {status} | Note: [dim]{note}[/dim]")
+
+        if valid_votes == 0:
+            return None, feedback_list
+
+        self._log(f"Result: {yes_votes}/{valid_votes} YES votes ({self.policy.describe()}).")
+        yes_weight, no_weight, _ = self._tally(reviews)
+        return bool(self.policy.decide(yes_weight, no_weight, 0.0)), feedback_list
+
+    def _run_rounds(
+        self,
+        objective: str,
+        tools_description: Union[str, ToolSet],
+        revision_executor: Optional[ThreadPoolExecutor],
+        draft: Optional[str] = None,
+    ) -> Tuple[Union[str, Plan], bool]:
+        """Runs the voting rounds. Returns (plan, approved)."""
         self._log(f"\n[bold magenta]--- Parliament Session Started ---[/bold magenta]")
         self._log(f"Objective: {objective}")
-        
-        # 1. President creates initial plan
-        self._log("[bold yellow]President is creating the initial plan...[/bold yellow]")
-        current_plan = self.president.create_plan(objective, tools_description)
-        
-        if self.ui:
-            self.ui.print_plan("Initial Plan", current_plan)
+
+        # Structured mode: each deputy's last valid verdict and the plan it was given on.
+        verdicts: Dict[int, Tuple[Plan, Dict[str, Any]]] = {}
+
+        # A stored draft gets a confirmation round; if it is not approved the President
+        # revises it with the deputies' feedback instead of starting over.
+        current_plan: Union[str, Plan]
+        feedback_list: List[Dict[str, Any]] = []
+        if draft is not None:
+            draft_plan: Union[str, Plan] = Plan.parse(draft) if self.structured else draft
+            self._show_plan("Draft Plan (from a similar objective)", draft_plan)
+            approved, feedback_list = self._vote_round(None, draft_plan, objective, tools_description, verdicts)
+            if approved:
+                self._log("[bold green]>>> Consensus Reached! Draft Plan Approved. <<<[/bold green]")
+                return draft_plan, True
+
+        if feedback_list:
+            self._log("[bold yellow]The draft was not approved. President is revising it...[/bold yellow]")
+            current_plan = self._revise_fn(draft_plan, feedback_list, objective)
+            self._show_plan("Revised Draft Plan", current_plan)
         else:
-            self._log(f"\n[bold cyan][Initial Plan]:[/bold cyan]\n{current_plan}\n")
+            # 1. President creates initial plan
+            self._log("[bold yellow]President is creating the initial plan...[/bold yellow]")
+            if self.structured:
+                current_plan = self.president.create_structured_plan(objective, tools_description)
+            else:
+                current_plan = self.president.create_plan(objective, tools_description)
+            self._show_plan("Initial Plan", current_plan)
 
         max_rounds = 3
         for round_num in range(1, max_rounds + 1):
-            if self.ui:
-                self.ui.print_parliament_header(round_num)
-            else:
-                self._log(f"[bold magenta]--- Round {round_num} of Voting ---[/bold magenta]")
-            
-            votes = []
-            feedback_list = []
-            
-            # 2. Deputies vote
-            valid_votes = 0
-            yes_votes = 0
-            
-            for deputy in self.deputies:
-                review = deputy.review_plan(current_plan, objective, tools_description)
-                
-                if "error" in review:
-                    self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: [bold red]ERROR[/bold red] | {review['error']}")
-                    continue
-                
-                vote = review.get("vote", False)
-                note = review.get("note", "No comment")
-                
-                valid_votes += 1
-                if vote:
-                    yes_votes += 1
-                    
-                feedback_list.append({"deputy": deputy.name, "note": note, "vote": vote})
-                
-                if self.ui:
-                    self.ui.print_deputy_vote(deputy.name, vote, note)
-                else:
-                    status = "[bold green]YES[/bold green]" if vote else "[bold red]NO[/bold red]"
-                    self._log(f"  -> Deputy [bold]{deputy.name}[/bold]: {status} | Note: [dim]{note}[/dim]")
+            speculation: Dict[str, Any] = {}
 
-            # 3. Check Consensus
-            if valid_votes == 0:
-                self._log("[bold yellow]No valid votes received (all deputies failed). Proceeding with current plan.[/bold yellow]")
-                return current_plan
+            def on_review(partial, plan=current_plan, last_round=round_num >= max_rounds) -> None:
+                if revision_executor is not None and not last_round:
+                    self._speculate(revision_executor, plan, objective, partial, speculation)
 
-            self._log(f"Result: {yes_votes}/{valid_votes} YES votes.")
+            # 2. Deputies vote, 3. Check Consensus
+            approved, feedback_list = self._vote_round(round_num, current_plan, objective, tools_description, verdicts, on_review)
+            if approved is None:
+                self._log("[bold yellow]No valid votes received (all deputies failed). Proceeding with current plan.[/bold yellow]")
+                return current_plan, False
 
-            if yes_votes == valid_votes:
+            if approved:
+                if speculation.get("future") is not None:
+                    speculation["future"].cancel()
                 self._log("[bold green]>>> Consensus Reached! Plan Approved. <<<[/bold green]")
-                return current_plan
-            
+                return current_plan, True
+
             # 4. Revise Plan if not approved
             if round_num < max_rounds:
                 self._log("[bold yellow]Consensus not reached. President is revising the plan...[/bold yellow]")
-                current_plan = self.president.revise_plan(current_plan, feedback_list, objective)
-                
-                if self.ui:
-                    self.ui.print_plan(f"Revised Plan V{round_num + 1}", current_plan)
-                else:
-                    self._log(f"\n[bold cyan][Revised Plan V{round_num + 1}]:[/bold cyan]\n{current_plan}\n")
+                current_plan = self._revise(current_plan, feedback_list, objective, speculation)
+                self._show_plan(f"Revised Plan V{round_num + 1}", current_plan)
             else:
                 self._log("[bold red]Max rounds reached. Proceeding with current plan despite lack of full consensus.[/bold red]")
-                return current_plan
+                return current_plan, False
 
-        return current_plan
+        return current_plan, False
@@ -0,0 +1,225 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_LIST_ITEM_RE = re.compile(r"^\s*(?:\d+[.)]|[-*+])\s+(.*\S)\s*$")
+# Rendering produced by Plan.to_markdown: "1. [s1] Action (tool: x; inputs: {...}; after: s0)"
+_RENDERED_STEP_RE = re.compile(r"^\[(?P<id>[^\]]+)\]\s+(?P<action>.*?)(?:\s+\((?P<meta>(?:tool|inputs|after): .*)\))?$")
+_META_RE = re.compile(r"^(?:tool: (?P<tool>[^;]+))?(?:(?:; )?inputs: (?P<inputs>\{.*\}))?(?:(?:; )?after: (?P<after>.*))?$")
+# Long field names accepted in place of the compact ones.
+_FIELD_ALIASES = {"action": "do", "inputs": "in", "depends_on": "after"}
+
+
+class PlanStep:
+    """One step: what to do, the tool expected to do it, its inputs and the steps it needs first."""
+
+    def __init__(self, id: str, action: str, tool: Optional[str] = None, inputs: Optional[Dict[str, Any]] = None, depends_on: Optional[List[str]] = None):
+        self.id = str(id)
+        self.action = action.strip()
+        self.tool = tool or None
+        self.inputs = dict(inputs or {})
+        self.depends_on = [str(d) for d in (depends_on or [])]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact form: empty fields are left out."""
+        data: Dict[str, Any] = {"id": self.id, "do": self.action}
+        if self.tool:
+            data["tool"] = self.tool
+        if self.inputs:
+            data["in"] = self.inputs
+        if self.depends_on:
+            data["after"] = self.depends_on
+        return data
+
+    @staticmethod
+    def compact_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+        """The same fields under their compact names ("action" -> "do", ...)."""
+        return {_FIELD_ALIASES.get(key, key): value for key, value in data.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_id: str) -> "PlanStep":
+        depends = data.get("after", data.get("depends_on")) or []
+        if isinstance(depends, str):
+            depends = [depends]
+        inputs = data.get("in", data.get("inputs")) or {}
+        return cls(
+            id=data.get("id") or default_id,
+            action=str(data.get("do", data.get("action", ""))),
+            tool=data.get("tool"),
+            inputs=inputs if isinstance(inputs, dict) else {"value": inputs},
+            depends_on=depends,
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PlanStep) and self.to_dict() == other.to_dict()
+
+    def render(self) -> str:
+        meta = []
+        if self.tool:
+            meta.append(f"tool: {self.tool}")
+        if self.inputs:
+            meta.append(f"inputs: {json.dumps(self.inputs, ensure_ascii=False)}")
+        if self.depends_on:
+            meta.append(f"after: {', '.join(self.depends_on)}")
+        suffix = f" ({'; '.join(meta)})" if meta else ""
+        return f"[{self.id}] {self.action}{suffix}"
+
+
+class PlanDiff:
+    """Step-level difference between two plans, matched by step id."""
+
+    def __init__(self, added: List[PlanStep], changed: List[PlanStep], removed: List[str], unchanged: List[PlanStep]):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+    def to_compact(self) -> str:
+        data: Dict[str, Any] = {}
+        if self.added:
+            data["added"] = [s.to_dict() for s in self.added]
+        if self.changed:
+            data["changed"] = [s.to_dict() for s in self.changed]
+        if self.removed:
+            data["removed"] = self.removed
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class Plan:
+    """
+    An ordered list of PlanSteps.
+
+    Plans serialize to compact JSON for prompts (`to_compact`) and to a numbered
+    Markdown list for people and the executing agent (`to_markdown`); `parse`
+    accepts either, and falls back to turning any Markdown list into steps.
+    """
+
+    def __init__(self, steps: Optional[List[PlanStep]] = None):
+        self.steps = list(steps or [])
+
+    def step(self, step_id: str) -> Optional[PlanStep]:
+        for step in self.steps:
+            if step.id == step_id:
+                return step
+        return None
+
+    def to_compact(self) -> str:
+        return json.dumps({"steps": [s.to_dict() for s in self.steps]}, ensure_ascii=False, separators=(",", ":"))
+
+    def to_markdown(self) -> str:
+        return "\n".join(f"{i}. {step.render()}" for i, step in enumerate(self.steps, start=1))
+
+    def outline(self, step_ids: Optional[List[str]] = None) -> str:
+        """One "id: action" line per step (optionally only the given ids)."""
+        wanted = set(step_ids) if step_ids is not None else None
+        return "\n".join(f"{s.id}: {s.action}" for s in self.steps if wanted is None or s.id in wanted)
+
+    def diff(self, newer: "Plan") -> PlanDiff:
+        old = {s.id: s for s in self.steps}
+        new_ids = {s.id for s in newer.steps}
+        added, changed, unchanged = [], [], []
+        for step in newer.steps:
+            previous = old.get(step.id)
+            if previous is None:
+                added.append(step)
+            elif previous != step:
+                changed.append(step)
+            else:
+                unchanged.append(step)
+        removed = [s.id for s in self.steps if s.id not in new_ids]
+        return PlanDiff(added, changed, removed, unchanged)
+
+    def apply(self, edits: Dict[str, Any]) -> "Plan":
+        """
+        Returns a new plan with step-level edits applied:
+        {"remove": [ids], "update": [steps], "add": [steps, optionally with "after_step"]}.
+        """
+        removed = {str(i) for i in edits.get("remove") or []}
+        updates = {}
+        for data in edits.get("update") or []:
+            if isinstance(data, dict) and data.get("id"):
+                updates[str(data["id"])] = data
+        steps = []
+        for step in self.steps:
+            if step.id in removed:
+                continue
+            if step.id in updates:
+                merged = {**step.to_dict(), **PlanStep.compact_keys(updates[step.id])}
+                step = PlanStep.from_dict(merged, step.id)
+            steps.append(step)
+
+        # Ids of removed steps are not reused, so a diff never mistakes a new step for an edit.
+        used = {s.id for s in self.steps}
+        for data in edits.get("add") or []:
+            if not isinstance(data, dict):
+                continue
+            step_id = str(data.get("id") or "")
+            if not step_id or step_id in used:
+                step_id = self._next_id(used)
+            step = PlanStep.from_dict({**data, "id": step_id}, step_id)
+            used.add(step_id)
+            anchor = data.get("after_step")
+            position = len(steps)
+            for i, existing in enumerate(steps):
+                if existing.id == anchor:
+                    position = i + 1
+                    break
+            steps.insert(position, step)
+        return Plan(steps)
+
+    @staticmethod
+    def _next_id(used) -> str:
+        n = len(used) + 1
+        while f"s{n}" in used:
+            n += 1
+        return f"s{n}"
+
+    @classmethod
+    def from_data(cls, data: Any) -> Optional["Plan"]:
+        steps = data.get("steps") if isinstance(data, dict) else data
+        if not isinstance(steps, list):
+            return None
+        parsed = [PlanStep.from_dict(s, f"s{i}") for i, s in enumerate(steps, start=1) if isinstance(s, dict)]
+        return cls(parsed) if parsed else None
+
+    @classmethod
+    def parse(cls, text: str) -> "Plan":
+        """Reads a plan from JSON ({"steps": [...]}) or from a Markdown list."""
+        match = _JSON_OBJECT_RE.search(text)
+        if match:
+            try:
+                plan = cls.from_data(json.loads(match.group(0)))
+                if plan is not None:
+                    return plan
+            except ValueError:
+                pass
+
+        steps = []
+        for line in text.splitlines():
+            item = _LIST_ITEM_RE.match(line)
+            if not item:
+                continue
+            content = item.group(1)
+            rendered = _RENDERED_STEP_RE.match(content)
+            if rendered:
+                meta = _META_RE.match(rendered.group("meta") or "")
+                tool, inputs, after = None, {}, []
+                if meta:
+                    tool = meta.group("tool")
+                    if meta.group("inputs"):
+                        try:
+                            inputs = json.loads(meta.group("inputs"))
+                        except ValueError:
+                            inputs = {"value": meta.group("inputs")}
+                    after = [v.strip() for v in (meta.group("after") or "").split(",") if v.strip()]
+                steps.append(PlanStep(rendered.group("id"), rendered.group("action"), tool, inputs, after))
+            else:
+                steps.append(PlanStep(f"s{len(steps) + 1}", content))
+        if not steps and text.strip():
+            steps.append(PlanStep("s1", text.strip()))
+        return cls(steps)
@@ -0,0 +1,224 @@
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# MinHash signature length and LSH banding (NUM_BANDS * ROWS_PER_BAND == NUM_HASHES).
+NUM_HASHES = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // NUM_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations() -> List[Tuple[int, int]]:
+    # Fixed seeds: signatures must stay comparable across processes and versions.
+    params = []
+    for i in range(NUM_HASHES):
+        digest = hashlib.blake2b(f"ai-congress-minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        params.append(((a % (_MERSENNE_PRIME - 1)) + 1, b % _MERSENNE_PRIME))
+    return params
+
+
+_PERMUTATIONS = _permutations()
+
+
+def default_store_path() -> str:
+    return os.getenv("AI_CONGRESS_PLAN_STORE_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ai_congress", "plans.sqlite"
+    )
+
+
+def normalize_objective(objective: str) -> str:
+    """Lower-cases, unifies quotes and collapses whitespace and trailing punctuation."""
+    text = objective.lower().replace("’", "'").replace("“", '"').replace("”", '"')
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .!?;:")
+
+
+def workspace_fingerprint(root: str = ".") -> str:
+    """
+    Identifies the working directory cheaply: its absolute path, its top-level entries
+    and, for git checkouts, the commit HEAD points to. Plans made for another tree
+    (or another commit) do not match.
+    """
+    root = os.path.abspath(root)
+    parts = [root]
+    try:
+        parts.extend(sorted(os.listdir(root)))
+    except OSError:
+        pass
+    head_path = os.path.join(root, ".git", "HEAD")
+    try:
+        with open(head_path, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        parts.append(head)
+        if head.startswith("ref: "):
+            with open(os.path.join(root, ".git", head[5:]), "r", encoding="utf-8") as f:
+                parts.append(f.read().strip())
+    except OSError:
+        pass
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def shingles(text: str, size: int = 4) -> List[bytes]:
+    """Distinct character shingles of the normalized text."""
+    text = normalize_objective(text)
+    if len(text) <= size:
+        return [text.encode("utf-8")] if text else []
+    return list({text[i:i + size].encode("utf-8") for i in range(len(text) - size + 1)})
+
+
+def minhash(text: str) -> List[int]:
+    hashes = [int.from_bytes(hashlib.blake2b(s, digest_size=8).digest(), "little") for s in shingles(text)]
+    if not hashes:
+        return [_MAX_HASH] * NUM_HASHES
+    return [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_HASHES
+
+
+def _pack(signature: List[int]) -> bytes:
+    return struct.pack(f"<{NUM_HASHES}I", *signature)
+
+
+def _unpack(blob: bytes) -> List[int]:
+    return list(struct.unpack(f"<{NUM_HASHES}I", blob))
+
+
+def _bands(signature: List[int]) -> List[str]:
+    packed = _pack(signature)
+    width = ROWS_PER_BAND * 4
+    return [
+        f"{i}:" + hashlib.blake2b(packed[i * width:(i + 1) * width], digest_size=8).hexdigest()
+        for i in range(NUM_BANDS)
+    ]
+
+
+class PlanStore:
+    """
+    Approved Parliament plans, persisted in SQLite.
+
+    Plans are scoped by a tool-set digest and a workspace fingerprint: exact lookups
+    match the normalized objective within the scope, and near-duplicate lookups use
+    MinHash signatures with LSH banding, so only plans sharing a band are compared.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None, max_entries: int = 2000):
+        self.path = path or default_store_path()
+        if threshold is None:
+            threshold = float(os.getenv("AI_CONGRESS_PLAN_SIMILARITY", "0.5"))
+        self.threshold = float(threshold)
+        self.max_entries = max(1, int(max_entries))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._db.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS plans (
+                    id INTEGER PRIMARY KEY,
+                    scope TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    objective TEXT NOT NULL,
+                    plan TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    created REAL NOT NULL,
+                    used REAL NOT NULL,
+                    UNIQUE (scope, normalized)
+                );
+                CREATE TABLE IF NOT EXISTS plan_bands (
+                    scope TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    plan_id INTEGER NOT NULL,
+                    PRIMARY KEY (scope, bucket, plan_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS plan_bands_plan ON plan_bands(plan_id);
+                CREATE INDEX IF NOT EXISTS plans_used ON plans(used);
+                """
+            )
+            self._db.commit()
+
+    @staticmethod
+    def scope(toolset_digest: str, fingerprint: str) -> str:
+        return f"{toolset_digest}:{fingerprint}"
+
+    def _touch(self, plan_id: int) -> None:
+        self._db.execute("UPDATE plans SET used = ? WHERE id = ?", (time.time(), plan_id))
+        self._db.commit()
+
+    def get(self, objective: str, scope: str) -> Optional[str]:
+        """The stored plan for exactly this (normalized) objective, if any."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, plan FROM plans WHERE scope = ? AND normalized = ?",
+                (scope, normalize_objective(objective)),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(row[0])
+            return row[1]
+
+    def find_similar(self, objective: str, scope: str) -> Optional[Tuple[str, str, float]]:
+        """(stored objective, plan, similarity) of the closest plan above the threshold."""
+        signature = minhash(objective)
+        buckets = _bands(signature)
+        placeholders = ",".join("?" for _ in buckets)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT p.id, p.objective, p.plan, p.signature FROM plan_bands b "
+                "JOIN plans p ON p.id = b.plan_id "
+                f"WHERE b.scope = ? AND b.bucket IN ({placeholders})",
+                (scope, *buckets),
+            ).fetchall()
+            best = None
+            for plan_id, stored_objective, plan, blob in rows:
+                score = similarity(signature, _unpack(blob))
+                if score >= self.threshold and (best is None or score > best[3]):
+                    best = (plan_id, stored_objective, plan, score)
+            if best is None:
+                return None
+            self._touch(best[0])
+            return best[1], best[2], best[3]
+
+    def put(self, objective: str, scope: str, plan: str) -> None:
+        normalized = normalize_objective(objective)
+        signature = minhash(objective)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO plans (scope, normalized, objective, plan, signature, created, used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(scope, normalized) DO UPDATE SET objective = excluded.objective, "
+                "plan = excluded.plan, signature = excluded.signature, used = excluded.used",
+                (scope, normalized, objective, plan, _pack(signature), now, now),
+            )
+            (plan_id,) = self._db.execute(
+                "SELECT id FROM plans WHERE scope = ? AND normalized = ?", (scope, normalized)
+            ).fetchone()
+            self._db.execute("DELETE FROM plan_bands WHERE plan_id = ?", (plan_id,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO plan_bands (scope, bucket, plan_id) VALUES (?, ?, ?)",
+                ((scope, bucket, plan_id) for bucket in _bands(signature)),
+            )
+            stale = self._db.execute(
+                "SELECT id FROM plans ORDER BY used DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            ).fetchall()
+            self._db.executemany("DELETE FROM plan_bands WHERE plan_id = ?", stale)
+            self._db.executemany("DELETE FROM plans WHERE id = ?", stale)
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM plan_bands")
+            self._db.execute("DELETE FROM plans")
+            self._db.commit()
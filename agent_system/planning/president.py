@@ -1,23 +1,31 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import json
 import re
+from ..toolset import ToolSet, tools_description as describe_tools
+from .plan import Plan
+
+STRUCTURED_STEP_FORMAT = (
+    'Each step is {"id": "s1", "do": "what to do", "tool": "tool_name or omit", '
+    '"in": {"arg": "value"} (omit if none), "after": ["ids of steps it depends on"] (omit if none)}.'
+)
 
 class President:
     def __init__(self, model: str, provider):
         self.model = model
         self.provider = provider
 
-    def create_plan(self, objective: str, tools_description: str) -> str:
+    def create_plan(self, objective: str, tools_description: Union[str, ToolSet]) -> str:
+        # The tools go in the system prompt so that every call shares one cacheable prefix.
         system_prompt = (
             "You are the President of the AI Parliament.\n"
             "Your Goal: Create a detailed, step-by-step plan to achieve the User's Objective.\n"
             "You have access to specific Tools. The plan should be clear and actionable.\n"
-            "Format: Markdown list."
+            "Format: Markdown list.\n\n"
+            f"Available Tools:\n{describe_tools(tools_description)}"
         )
 
         user_message = (
             f"Objective: {objective}\n\n"
-            f"Available Tools:\n{tools_description}\n\n"
             "Please create the initial plan."
         )
 
@@ -40,38 +48,103 @@ class President:
             "Format: Markdown list."
         )
 
+        # The objective is its own message so the prefix stays byte-identical across rounds.
         user_message = (
-            f"Objective: {objective}\n\n"
-            f"Current Plan:\n{current_plan}\n\n"
             f"Feedback from Parliament:\n{feedback_str}\n\n"
+            f"Current Plan:\n{current_plan}\n\n"
             "Please provide the Revised Plan (V2)."
         )
 
         return self.provider.generate(
             messages=[
                 {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Objective: {objective}"},
+                {"role": "user", "content": user_message}
+            ],
+            model=self.model,
+            max_tokens=2000
+        )
+
+    def create_structured_plan(self, objective: str, tools_description: Union[str, ToolSet]) -> Plan:
+        system_prompt = (
+            "You are the President of the AI Parliament.\n"
+            "Your Goal: Create a detailed, step-by-step plan to achieve the User's Objective.\n"
+            "You have access to specific Tools. The plan should be clear and actionable.\n"
+            'Format: JSON only, {"steps": [...]}. ' + STRUCTURED_STEP_FORMAT + "\n\n"
+            f"Available Tools:\n{describe_tools(tools_description)}"
+        )
+
+        content = self.provider.generate(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Objective: {objective}\n\nPlease create the initial plan."}
+            ],
+            model=self.model,
+            max_tokens=2000
+        )
+        return Plan.parse(content)
+
+    def revise_structured_plan(self, current_plan: Plan, feedback_list: List[Dict], objective: str) -> Plan:
+        """
+        Asks for step-level edits instead of a rewritten plan, so unchanged steps keep
+        their ids (and deputies do not need to review them again).
+        """
+        feedback_str = "\n".join([f"- {f['deputy']}: {f['note']}" for f in feedback_list])
+
+        system_prompt = (
+            "You are the President of the AI Parliament.\n"
+            "Your Goal: Revise the current plan based on the feedback from the Deputies.\n"
+            "Incorporate valid suggestions and change only the steps that need it.\n"
+            'Format: JSON only, {"remove": ["ids"], "update": [steps with changed fields], '
+            '"add": [new steps, each may set "after_step": "id" to position it]}. ' + STRUCTURED_STEP_FORMAT
+        )
+
+        user_message = (
+            f"Feedback from Parliament:\n{feedback_str}\n\n"
+            f"Current Plan:\n{current_plan.to_compact()}\n\n"
+            "Please provide the edits."
+        )
+
+        content = self.provider.generate(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Objective: {objective}"},
                 {"role": "user", "content": user_message}
             ],
             model=self.model,
             max_tokens=2000
         )
 
-    def should_plan(self, objective: str, tools_description: str) -> Dict[str, Any]:
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        try:
+            data = json.loads(match.group(0) if match else content)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and any(k in data for k in ("remove", "update", "add")):
+            return current_plan.apply(data)
+        # The model rewrote the whole plan instead; step ids still let deputies diff it.
+        revised = Plan.parse(content)
+        return revised if revised.steps else current_plan
+
+    def should_plan(self, objective: str, tools_description: Union[str, ToolSet]) -> Dict[str, Any]:
         """
         Decide whether the request needs a full parliament plan.
-        Returns {"plan": bool, "reason": str}.
+        Returns {"plan": bool, "reason": str} plus "answer" when the objective was
+        answered directly (no tools needed), or "fallback": True if the reply was unusable.
         """
         system_prompt = (
             "You are the President of the AI Parliament.\n"
             "Task: Decide if the user's objective needs a full planning session.\n"
-            "Return JSON only: {\"plan\": true/false, \"reason\": \"brief justification\"}.\n"
+            "Return JSON only: {\"plan\": true/false, \"reason\": \"brief justification\", \"answer\": null}.\n"
             "Use plan=false for greetings, short factual answers, or single-step/tool tasks.\n"
-            "Use plan=true for multi-step, ambiguous, or risky tasks that benefit from review."
+            "Use plan=true for multi-step, ambiguous, or risky tasks that benefit from review.\n"
+            "If plan=false and you can fully answer without any tool (greetings, general knowledge), "
+            "put the reply in \"answer\"; otherwise leave it null.\n\n"
+            f"Available Tools:\n{describe_tools(tools_description)}"
         )
 
         user_message = (
             f"Objective: {objective}\n\n"
-            f"Available Tools:\n{tools_description}\n\n"
             "Decide if planning is necessary."
         )
 
@@ -81,7 +154,7 @@ class President:
                 {"role": "user", "content": user_message}
             ],
             model=self.model,
-            max_tokens=400
+            max_tokens=800
         )
 
         # Robust JSON extraction
@@ -91,7 +164,11 @@ class President:
             data = json.loads(json_str)
             plan = bool(data.get("plan", True))
             reason = data.get("reason", "No reason provided.")
-            return {"plan": plan, "reason": reason}
+            decision = {"plan": plan, "reason": reason}
+            answer = data.get("answer")
+            if not plan and isinstance(answer, str) and answer.strip():
+                decision["answer"] = answer.strip()
+            return decision
         except Exception:
             # Default to planning if parsing fails
-            return {"plan": True, "reason": "Fallback to plan (unable to parse decision)."}
+            return {"plan": True, "reason": "Fallback to plan (unable to parse decision).", "fallback": True}
@@ -0,0 +1,185 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Union
+from ..toolset import ToolSet
+
+_WORD_RE = re.compile(r"[\w./-]+")
+
+GREETINGS = {"hi", "hello", "hey", "thanks", "thank", "thx", "ok", "okay", "bye", "yo", "morning", "cheers"}
+# Requests a single tool call (or no tool) can satisfy.
+SIMPLE_VERBS = {"list", "ls", "show", "read", "open", "cat", "print", "find", "search", "grep", "what", "whats", "who", "where", "which", "explain", "define"}
+# A conjunction or a second (mutating) verb makes a short request compound: "run the tests and fix failures".
+COMPOUND_WORDS = {
+    "and", "then", "also", "plus", "after", "before", "fix", "change", "update", "add", "remove",
+    "delete", "create", "write", "edit", "modify", "rename", "replace", "make", "repair", "resolve",
+}
+# Shell and destructive terms: a short request containing one is not a harmless lookup.
+MUTATING_TERMS = {
+    "rm", "mv", "cp", "sudo", "chmod", "chown", "kill", "pkill", "-delete", "-exec", "-rf", "drop",
+    "truncate", "install", "uninstall", "migrate", "migration", "reset", "push", "format", "overwrite",
+}
+# Work that usually benefits from a reviewed plan.
+PLAN_KEYWORDS = {
+    "refactor", "implement", "migrate", "design", "architecture", "rewrite", "build", "deploy",
+    "integrate", "redesign", "restructure", "optimize", "port", "upgrade", "feature", "pipeline",
+}
+STEP_MARKERS = re.compile(r"\b(then|after that|afterwards|finally|step \d|first,)\b|\n\s*(?:\d+[.)]|[-*])\s", re.I)
+
+
+def default_log_path() -> str:
+    return os.getenv("AI_CONGRESS_TRIAGE_LOG") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ai_congress", "triage.jsonl"
+    )
+
+
+def tokenize(text: str) -> List[str]:
+    """Words plus word bigrams; the features of the learned model."""
+    words = _WORD_RE.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def heuristic_decision(objective: str) -> Optional[Dict[str, Any]]:
+    """
+    Length, keyword and intent rules. Returns {"plan", "reason"} when the rules are
+    confident and None for inputs they cannot classify.
+    """
+    if not objective.strip():
+        return {"plan": False, "reason": "Empty input."}
+    words = _WORD_RE.findall(objective.lower())
+    if not words:
+        # Non-empty text the rules cannot read: let the model or the LLM decide.
+        return None
+    if len(words) <= 4 and all(w in GREETINGS or w in {"there", "you", "so", "much", "good", "all"} for w in words):
+        return {"plan": False, "reason": "Greeting or acknowledgement."}
+    if (
+        len(words) <= 8
+        and words[0] in SIMPLE_VERBS
+        and not PLAN_KEYWORDS.intersection(words)
+        and not COMPOUND_WORDS.intersection(words[1:])
+        and not MUTATING_TERMS.intersection(words[1:])
+    ):
+        return {"plan": False, "reason": "Short single-step request."}
+    if len(words) >= 12 and (PLAN_KEYWORDS.intersection(words) or STEP_MARKERS.search(objective)):
+        return {"plan": True, "reason": "Multi-step or structural change."}
+    if len(words) >= 60:
+        return {"plan": True, "reason": "Long, detailed request."}
+    return None
+
+
+class NaiveBayesTriage:
+    """
+    Multinomial naive Bayes over word and bigram counts, with add-one smoothing.
+
+    Trained from logged (objective, plan) decisions and updated incrementally as new
+    decisions arrive; `probability` is P(plan | objective).
+    """
+
+    def __init__(self):
+        self.docs = {True: 0, False: 0}
+        self.token_totals = {True: 0, False: 0}
+        self.counts: Dict[bool, Dict[str, int]] = {True: {}, False: {}}
+        self.vocabulary = set()
+
+    @property
+    def examples(self) -> int:
+        return self.docs[True] + self.docs[False]
+
+    def learn(self, objective: str, plan: bool) -> None:
+        plan = bool(plan)
+        self.docs[plan] += 1
+        counts = self.counts[plan]
+        for token in tokenize(objective):
+            counts[token] = counts.get(token, 0) + 1
+            self.token_totals[plan] += 1
+            self.vocabulary.add(token)
+
+    def probability(self, objective: str) -> float:
+        if not self.docs[True] or not self.docs[False]:
+            return 0.5
+        vocab = len(self.vocabulary) + 1
+        scores = {}
+        for label in (True, False):
+            score = math.log(self.docs[label] / self.examples)
+            denominator = self.token_totals[label] + vocab
+            counts = self.counts[label]
+            for token in tokenize(objective):
+                score += math.log((counts.get(token, 0) + 1) / denominator)
+            scores[label] = score
+        diff = scores[False] - scores[True]
+        if diff > 700:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(diff))
+
+
+class Triage:
+    """
+    Decides whether an objective needs a Parliament session, cheapest check first:
+    the heuristic rules, then the learned model (once it has enough examples and is
+    confident), and only then the President's LLM triage, which may also answer the
+    objective directly. LLM decisions are logged as training data for the model.
+    """
+
+    def __init__(
+        self,
+        president,
+        log_path: Optional[str] = None,
+        min_examples: Optional[int] = None,
+        confidence: Optional[float] = None,
+    ):
+        self.president = president
+        self.log_path = log_path or default_log_path()
+        if min_examples is None:
+            min_examples = int(os.getenv("AI_CONGRESS_TRIAGE_MIN_EXAMPLES", "20"))
+        if confidence is None:
+            confidence = float(os.getenv("AI_CONGRESS_TRIAGE_CONFIDENCE", "0.9"))
+        self.min_examples = max(1, int(min_examples))
+        self.confidence = float(confidence)
+        self.model = NaiveBayesTriage()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.model.learn(entry["objective"], entry["plan"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+    def _record(self, objective: str, plan: bool) -> None:
+        with self._lock:
+            self.model.learn(objective, plan)
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"objective": objective, "plan": plan}) + "\n")
+            except OSError:
+                pass
+
+    def decide(self, objective: str, tools_description: Union[str, ToolSet]) -> Dict[str, Any]:
+        """
+        Returns {"plan": bool, "reason": str, "source": "rules" | "model" | "llm"} and,
+        when the LLM answered a question that needs no tools, "answer".
+        """
+        decision = heuristic_decision(objective)
+        if decision is not None:
+            return {**decision, "source": "rules"}
+
+        if self.model.examples >= self.min_examples:
+            p = self.model.probability(objective)
+            if p >= self.confidence:
+                return {"plan": True, "reason": f"Similar requests were planned (p={p:.2f}).", "source": "model"}
+            if p <= 1.0 - self.confidence:
+                return {"plan": False, "reason": f"Similar requests ran directly (p={1.0 - p:.2f}).", "source": "model"}
+
+        decision = self.president.should_plan(objective, tools_description)
+        if not decision.get("fallback"):
+            self._record(objective, decision["plan"])
+        return {**decision, "source": "llm"}
@@ -0,0 +1,87 @@
+"""
+Process-pool side of search_text.
+
+Kept to the standard library and outside the tools package (whose __init__ builds
+every tool), so spawned or forkserver workers import only this module.
+"""
+import io
+import os
+import re
+from typing import Callable, List
+
+_SCAN_WINDOW = None
+
+
+def init_worker(scan_window) -> None:
+    global _SCAN_WINDOW
+    _SCAN_WINDOW = scan_window
+
+
+def build_matcher(pattern: str, regex: bool, case_sensitive: bool) -> Callable[[str], bool]:
+    if regex:
+        compiled = re.compile(pattern, flags=0 if case_sensitive else re.IGNORECASE)
+        return lambda line: bool(compiled.search(line))
+    if case_sensitive:
+        return lambda line: pattern in line
+    needle = pattern.lower()
+    return lambda line: needle in line.lower()
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Returns `head` (bytes already read from `raw`) and then the rest of `raw`."""
+
+    def __init__(self, head: bytes, raw):
+        self._head = memoryview(head)
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        return self._raw.readinto(buffer)
+
+
+def search_file(file_path: str, base_path: str, matcher: Callable[[str], bool], limit: int) -> List[str]:
+    """Checks the first 4 KiB for binary content, then streams the file (those bytes included) line by line."""
+    results: List[str] = []
+    try:
+        with open(file_path, "rb", buffering=0) as raw:
+            head = raw.read(4096)
+            if b"\x00" in head:
+                return []
+            rel = None
+            stream = io.BufferedReader(_PrefixedReader(head, raw))
+            # newline=None gives the same universal-newline line splitting as text-mode open().
+            with io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline=None) as f:
+                for line_num, line in enumerate(f, start=1):
+                    if not matcher(line):
+                        continue
+                    if rel is None:
+                        rel = os.path.relpath(file_path, start=base_path)
+                    preview = line.rstrip("\r\n")
+                    results.append(f"{rel}:{line_num}: {preview}")
+                    if len(results) >= limit:
+                        break
+    except Exception:
+        return results
+    return results
+
+
+def scan_chunk(slot: int, chunk_id: int, files: List[str], base_path: str, query: tuple, limit: int) -> List[str]:
+    """Process-pool entry point: scans one chunk, stopping once the chunk leaves its scan's live window."""
+    matcher = build_matcher(*query)
+    found: List[str] = []
+    for file_path in files:
+        if _SCAN_WINDOW is not None:
+            with _SCAN_WINDOW.get_lock():
+                if not _SCAN_WINDOW[2 * slot] <= chunk_id <= _SCAN_WINDOW[2 * slot + 1]:
+                    break
+        found.extend(search_file(file_path, base_path, matcher, limit - len(found)))
+        if len(found) >= limit:
+            break
+    return found
@@ -0,0 +1,114 @@
+import importlib.util
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+# Context windows (in tokens) by model-name fragment; the longest matching fragment wins.
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4.1": 1047576,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "claude": 200000,
+    "gemini": 1048576,
+    "glm-4": 128000,
+    "kimi-k2": 131072,
+    "k2-think": 32768,
+    "deepseek": 65536,
+    "qwen": 32768,
+    "llama-3": 8192,
+    "llama-3.1": 131072,
+    "mistral": 32768,
+}
+
+DEFAULT_CONTEXT_WINDOW = 32768
+
+
+def context_window_for(model: str, default: int = DEFAULT_CONTEXT_WINDOW) -> int:
+    name = (model or "").lower()
+    best: Optional[str] = None
+    for fragment in MODEL_CONTEXT_WINDOWS:
+        if fragment in name and (best is None or len(fragment) > len(best)):
+            best = fragment
+    return MODEL_CONTEXT_WINDOWS[best] if best else default
+
+
+class TokenCounter(ABC):
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Returns the (approximate) number of tokens in text."""
+        pass
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    Offline BPE-style estimate.
+
+    Text is split the way GPT-style pre-tokenizers do (words with their leading
+    space, short digit runs, punctuation runs, whitespace) and each piece is priced
+    by script: short Latin words are one token, long words/identifiers cost about
+    one token per four characters, and CJK or other non-Latin characters cost
+    roughly one token each.
+    """
+
+    _PIECES = re.compile(
+        r"'(?:[sdmt]|ll|ve|re)"
+        r"| ?[A-Za-z]+"
+        r"| ?\d{1,3}"
+        r"|[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]"
+        r"| ?[^\s\w]+"
+        r"| ?[^\W\d_A-Za-z]+"
+        r"|\s+"
+    )
+    _CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokens = 0
+        for match in self._PIECES.finditer(text):
+            piece = match.group(0)
+            stripped = piece.lstrip(" ")
+            if not stripped:
+                tokens += 1
+                continue
+            first = stripped[0]
+            if first.isascii() and first.isalpha():
+                tokens += 1 + max(0, len(stripped) - 4) // 4
+            elif first.isdigit() or first.isspace():
+                tokens += 1
+            elif self._CJK.match(first):
+                tokens += 1
+            elif first.isascii():
+                # Punctuation merges in pairs in most BPE vocabularies ("()", "):", "->").
+                tokens += (len(stripped) + 1) // 2
+            else:
+                # Accented / non-Latin alphabetic scripts split into short pieces.
+                tokens += max(1, (len(stripped) + 1) // 2)
+        return tokens
+
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts via the optional 'tiktoken' package."""
+
+    def __init__(self, model: str = "", encoding: str = "cl100k_base"):
+        import tiktoken
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(model)
+        except Exception:
+            self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def default_token_counter(model: str = "") -> TokenCounter:
+    """tiktoken when it is installed (and has its encodings available), else the heuristic."""
+    if importlib.util.find_spec("tiktoken") is not None:
+        try:
+            return TiktokenCounter(model)
+        except Exception:
+            pass
+    return HeuristicTokenCounter()
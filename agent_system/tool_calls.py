@@ -0,0 +1,214 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def repair_json(json_str: str) -> str:
+    """Attempts to repair common JSON errors, specifically unescaped backslashes."""
+    # Replace unescaped backslashes that are NOT part of a valid escape sequence.
+    # Valid escapes: \" \\ \/ \b \f \n \r \t \uXXXX
+    # Regex: \\(?![/\"\\bfnrtu])
+    return re.sub(r'\\(?![/\"\\bfnrtu])', r'\\\\', json_str)
+
+
+def _decode(block: str) -> Tuple[Any, Optional[str]]:
+    """json.loads with a backslash-repair retry. Returns (data, None) or (None, first error)."""
+    try:
+        return json.loads(block), None
+    except json.JSONDecodeError as e:
+        try:
+            return json.loads(repair_json(block)), None
+        except json.JSONDecodeError:
+            return None, str(e)
+
+
+def load_tool_call(block: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Decodes one JSON block (repairing backslashes if needed) into (tool, args), or None."""
+    data, _ = _decode(block)
+    if isinstance(data, dict) and "tool" in data:
+        return data["tool"], data.get("args", {})
+    return None
+
+
+class ToolCallScan:
+    """Result of scan_tool_calls: the calls found, in order, and why other candidates failed."""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.errors: List[str] = []
+
+
+# Only the characters that can change the scanner's state; everything else is skipped by the regex engine.
+_SCAN_TOKENS = re.compile(r'```json|```|\\.|[{}"]', re.DOTALL)
+# A bare (unfenced) object is only taken for a failed tool call when it starts like one.
+_CALL_START = re.compile(r'\{\s*"(?:tool|name)"\s*:\s*"')
+# Inside a ```json block: string delimiters, escapes and the closing fence.
+_BLOCK_TOKENS = re.compile(r'\\.|"|```', re.DOTALL)
+
+
+def _looks_like_call(content: str, start: int) -> bool:
+    """A bare object that opens its own line and starts like a call; inline braces are prose."""
+    line_start = content.rfind("\n", 0, start) + 1
+    return not content[line_start:start].strip() and bool(_CALL_START.match(content, start))
+
+
+def scan_tool_calls(content: str) -> ToolCallScan:
+    """
+    Finds tool calls in a model response in one left-to-right pass.
+
+    Top-level JSON objects are delimited by string-aware brace matching. Objects inside a
+    ```json fence are preferred; bare objects are used only when no fenced call decodes.
+    A candidate that fails to decode is retried with backslash repair, then through its
+    direct child objects (e.g. a tool call wrapped in stray braces). Candidates that
+    still fail are reported in `errors` only if they sit in a ```json fence or open a
+    line like a call ({"tool": "..." or {"name": "..."); other braces are prose. A fence
+    inside a JSON object (outside a string) ends an unbalanced object instead of letting
+    it swallow the rest.
+    """
+    scan = ToolCallScan()
+    fenced_calls: List[Tuple[str, Dict[str, Any]]] = []
+    bare_calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    in_fence = False
+    depth = 0
+    in_string = False
+    start = 0
+    fenced = False
+    child_start = 0
+    children: List[Tuple[int, int]] = []
+
+    def settle(end: Optional[int]) -> None:
+        """Decodes the candidate starting at `start` (end=None: it never closed)."""
+        kind = "```json block" if fenced else "JSON object"
+        if end is not None:
+            data, error = _decode(content[start:end])
+            if isinstance(data, dict) and "tool" in data:
+                (fenced_calls if fenced else bare_calls).append((data["tool"], data.get("args", {})))
+                return
+            if error is None:
+                return  # Valid JSON that is not a tool call.
+        else:
+            error = "unbalanced braces (object never closed)"
+
+        found = False
+        for child_begin, child_end in children:
+            call = load_tool_call(content[child_begin:child_end])
+            if call is not None:
+                (fenced_calls if fenced else bare_calls).append(call)
+                found = True
+        if not found and (fenced or _looks_like_call(content, start)):
+            scan.errors.append(f"{kind} at offset {start}: {error}")
+
+    for m in _SCAN_TOKENS.finditer(content):
+        token = m.group(0)
+        pos = m.start()
+
+        if depth == 0:
+            if token == "```json":
+                in_fence = True
+            elif token == "```":
+                in_fence = False
+            elif token == "{":
+                depth = 1
+                in_string = False
+                start = pos
+                fenced = in_fence
+                children = []
+            continue
+
+        if in_string:
+            if token == '"':
+                in_string = False
+            continue
+
+        if token == '"':
+            in_string = True
+        elif token == "{":
+            depth += 1
+            if depth == 2:
+                child_start = pos
+        elif token == "}":
+            depth -= 1
+            if depth == 1:
+                children.append((child_start, pos + 1))
+            elif depth == 0:
+                settle(pos + 1)
+        elif token.startswith("```"):
+            # A fence outside any string: the object was cut off.
+            depth = 0
+            settle(None)
+            in_fence = token == "```json"
+
+    if depth > 0:
+        settle(None)
+
+    scan.calls = fenced_calls or bare_calls
+    return scan
+
+
+class IncrementalToolCallParser:
+    """
+    Detects complete ```json tool blocks while a response is still streaming.
+
+    feed() returns the tool calls whose closing fence arrived in that chunk, so the
+    agent can validate (or start) them before the model finishes generating. Like
+    scan_tool_calls, it tracks JSON strings and escapes: a ``` inside a string value
+    (e.g. file content with a code fence) does not close the block.
+    """
+
+    OPEN_FENCE = "```json"
+    CLOSE_FENCE = "```"
+
+    def __init__(self):
+        self._buffer = ""
+        self._scan_from = 0
+        self._open_at: Optional[int] = None
+        self._in_string = False
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        self._buffer += chunk
+        calls: List[Tuple[str, Dict[str, Any]]] = []
+
+        while True:
+            if self._open_at is None:
+                start = self._buffer.find(self.OPEN_FENCE, self._scan_from)
+                if start == -1:
+                    # Keep enough tail to catch a fence split across chunks.
+                    self._scan_from = max(self._scan_from, len(self._buffer) - len(self.OPEN_FENCE) + 1)
+                    break
+                self._open_at = start
+                self._scan_from = start + len(self.OPEN_FENCE)
+                self._in_string = False
+
+            end = self._find_close()
+            if end == -1:
+                break
+
+            block = self._buffer[self._open_at + len(self.OPEN_FENCE):end].strip()
+            self._open_at = None
+            self._scan_from = end + len(self.CLOSE_FENCE)
+
+            call = load_tool_call(block)
+            if call is not None:
+                calls.append(call)
+
+        return calls
+
+    def _find_close(self) -> int:
+        """Offset of the fence closing the open block, or -1 (resuming later where it stopped)."""
+        pos = self._scan_from
+        for m in _BLOCK_TOKENS.finditer(self._buffer, pos):
+            token = m.group(0)
+            if token == "```" and not self._in_string:
+                return m.start()
+            if token == '"':
+                self._in_string = not self._in_string
+            pos = m.end()
+        # Only the last two characters can start a token that is still incomplete
+        # (a backslash escape or a partial fence split across chunks).
+        self._scan_from = max(pos, len(self._buffer) - 2)
+        return -1
@@ -1,8 +1,18 @@
+import bisect
 import os
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
 from ..core import Tool
+from ..transactions import atomic_write, remove_file
+
+HUNK_RE = re.compile(r"^@@\s*-(\d+)(?:,(\d+))?\s+\+(\d+)(?:,(\d+))?\s*@@")
+GIT_HEADER_RE = re.compile(r"^diff --git (\S+) (\S+)")
+DEV_NULL = "/dev/null"
+
+
+def _fingerprint(line: str) -> int:
+    return hash(line.rstrip("\r\n"))
 
 
 class ApplyPatchTool(Tool):
@@ -12,7 +22,20 @@ class ApplyPatchTool(Tool):
 
     @property
     def description(self) -> str:
-        return "Apply a unified-diff style patch to a file (diff engine)."
+        return (
+            "Apply a unified-diff style patch (diff engine). Accepts multi-file diffs with "
+            "'diff --git' / '---' / '+++' headers; hunks whose line numbers drifted are located "
+            "nearby, ignoring up to `fuzz` outer context lines if needed."
+        )
+
+    def __init__(self, fuzz: Optional[int] = None, window: Optional[int] = None):
+        if fuzz is None:
+            fuzz = int(os.getenv("AI_CONGRESS_PATCH_FUZZ", "2"))
+        if window is None:
+            window = int(os.getenv("AI_CONGRESS_PATCH_WINDOW", "500"))
+        self.fuzz = max(0, int(fuzz))
+        # How far (in lines) a hunk may have drifted from its header position.
+        self.window = max(0, int(window))
 
     def _strip_code_fences(self, text: str) -> str:
         lines = text.strip().splitlines()
@@ -28,32 +51,59 @@ class ApplyPatchTool(Tool):
     def _detect_newline(self, raw: str) -> str:
         return "\r\n" if "\r\n" in raw else "\n"
 
-    def _parse_hunks(self, patch_text: str) -> List[Dict[str, Any]]:
-        hunks: List[Dict[str, Any]] = []
+    def _header_path(self, line: str) -> str:
+        # "--- a/path\t2024-01-01 00:00:00" -> "a/path"
+        return line[4:].split("\t", 1)[0].strip()
+
+    def _parse_patch(self, patch_text: str) -> List[Dict[str, Any]]:
+        """
+        Splits a (possibly multi-file) unified diff into per-file patches:
+        {"old_path", "new_path", "hunks"}. Paths are None when the patch has no headers.
+        """
+        files: List[Dict[str, Any]] = []
+        current_file: Optional[Dict[str, Any]] = None
         current: Optional[Dict[str, Any]] = None
 
-        hunk_re = re.compile(r"^@@\s*-(\d+)(?:,(\d+))?\s+\+(\d+)(?:,(\d+))?\s*@@")
+        def new_file() -> Dict[str, Any]:
+            entry = {"old_path": None, "new_path": None, "hunks": []}
+            files.append(entry)
+            return entry
+
+        lines = patch_text.splitlines()
+        for n, line in enumerate(lines):
+            m = GIT_HEADER_RE.match(line)
+            if m:
+                current_file = new_file()
+                current_file["old_path"], current_file["new_path"] = m.group(1), m.group(2)
+                current = None
+                continue
 
-        for line in patch_text.splitlines():
-            if line.startswith(("---", "+++")):
+            # A "---" line only starts a file header when "+++" follows; otherwise it is a
+            # removed line that happens to begin with "--".
+            if line.startswith("--- ") and n + 1 < len(lines) and lines[n + 1].startswith("+++ "):
+                if current_file is None or current_file["hunks"]:
+                    current_file = new_file()
+                current_file["old_path"] = self._header_path(line)
+                current = None
+                continue
+            if line.startswith("+++ ") and current is None and current_file is not None:
+                current_file["new_path"] = self._header_path(line)
                 continue
             if line.startswith("\\ No newline at end of file"):
                 continue
 
-            m = hunk_re.match(line)
+            m = HUNK_RE.match(line)
             if m:
-                old_start = int(m.group(1))
-                old_count = int(m.group(2) or "1")
-                new_start = int(m.group(3))
-                new_count = int(m.group(4) or "1")
+                if current_file is None:
+                    current_file = new_file()
                 current = {
-                    "old_start": old_start,
-                    "old_count": old_count,
-                    "new_start": new_start,
-                    "new_count": new_count,
+                    "old_start": int(m.group(1)),
+                    "old_count": int(m.group(2) or "1"),
+                    "new_start": int(m.group(3)),
+                    "new_count": int(m.group(4) or "1"),
                     "lines": [],
                 }
-                hunks.append(current)
+                current_file["hunks"].append(current)
                 continue
 
             if current is None:
@@ -67,78 +117,251 @@ class ApplyPatchTool(Tool):
             prefix = line[0]
             if prefix in {" ", "+", "-"}:
                 current["lines"].append((prefix, line[1:]))
-            # Ignore anything else (e.g., "diff --git" lines)
+            # Ignore anything else (e.g., "index ..." or "new file mode" lines)
+
+        for entry in files:
+            for hunk in entry["hunks"]:
+                # Blank separator lines between file sections are not part of the hunk.
+                body = hunk["lines"]
+                old_len = sum(1 for op, _ in body if op != "+")
+                while body and body[-1] == (" ", "") and old_len > hunk["old_count"]:
+                    body.pop()
+                    old_len -= 1
+        return [entry for entry in files if entry["hunks"]]
+
+    def _resolve_path(self, entry: Dict[str, Any]) -> Tuple[Optional[str], bool, bool]:
+        """Returns (path, creates, deletes) for a per-file patch taken from its headers."""
+        old_path, new_path = entry["old_path"], entry["new_path"]
+        creates = old_path == DEV_NULL
+        deletes = new_path == DEV_NULL
+        # git-style "a/" and "b/" prefixes are stripped when both sides carry them.
+        if (
+            old_path and new_path
+            and (old_path.startswith("a/") or creates)
+            and (new_path.startswith("b/") or deletes)
+        ):
+            old_path = old_path[2:] if not creates else old_path
+            new_path = new_path[2:] if not deletes else new_path
+        path = old_path if deletes else (new_path if new_path and new_path != DEV_NULL else old_path)
+        if path == DEV_NULL:
+            path = None
+        return path, creates, deletes
+
+    def _find_hunk(
+        self,
+        old_lines: List[str],
+        file_lines: List[str],
+        fingerprints: List[int],
+        positions: Dict[int, List[int]],
+        expected: int,
+        lowest: int,
+    ) -> Optional[int]:
+        """
+        Locates old_lines in file_lines at or after `lowest` and within `window` lines
+        of `expected`, preferring the position closest to `expected`. Candidates come
+        from the rarest line's fingerprint positions and are verified by fingerprint,
+        then by text.
+        """
+        if not old_lines:
+            return max(lowest, min(expected, len(file_lines)))
+
+        old_fps = [_fingerprint(line) for line in old_lines]
+        anchor = min(range(len(old_fps)), key=lambda j: len(positions.get(old_fps[j], ())))
+        anchor_positions = positions.get(old_fps[anchor], [])
+        start_at = bisect.bisect_left(anchor_positions, max(lowest, expected - self.window) + anchor)
+        stop_at = bisect.bisect_right(anchor_positions, expected + self.window + anchor)
+        candidates = sorted(
+            (q - anchor for q in anchor_positions[start_at:stop_at]),
+            key=lambda p: (abs(p - expected), p),
+        )
+        size = len(old_lines)
+        for pos in candidates:
+            if pos + size > len(file_lines):
+                continue
+            if fingerprints[pos:pos + size] != old_fps:
+                continue
+            if all(
+                file_lines[pos + k].rstrip("\r\n") == old_lines[k].rstrip("\r\n")
+                for k in range(size)
+            ):
+                return pos
+        return None
+
+    def _trim_context(self, body: List[Tuple[str, str]], fuzz: int) -> Tuple[List[Tuple[str, str]], int]:
+        """Drops up to `fuzz` leading and trailing context lines. Returns (body, dropped_leading)."""
+        lead = 0
+        while lead < fuzz and lead < len(body) and body[lead][0] == " ":
+            lead += 1
+        trail = 0
+        while trail < fuzz and trail < len(body) - lead and body[len(body) - 1 - trail][0] == " ":
+            trail += 1
+        return body[lead:len(body) - trail], lead
 
-        return hunks
+    def _apply_hunks(
+        self, file_lines: List[str], hunks: List[Dict[str, Any]], newline: str
+    ) -> Tuple[Optional[List[str]], List[str]]:
+        """
+        Applies all hunks of one file in a single pass over the original lines.
+        Returns (new_lines, notes); new_lines is None on failure and notes holds the error.
+        """
+        fingerprints = [_fingerprint(line) for line in file_lines]
+        positions: Dict[int, List[int]] = {}
+        for i, fp in enumerate(fingerprints):
+            positions.setdefault(fp, []).append(i)
 
-    def _normalize(self, s: str) -> str:
-        return s.rstrip("\r\n")
+        out: List[str] = []
+        copied_to = 0
+        drift = 0
+        notes: List[str] = []
 
-    def execute(self, path: str, patch: str, dry_run: bool = False) -> str:
+        for number, hunk in enumerate(hunks, start=1):
+            expected = max(0, hunk["old_start"] - 1 + drift)
+            if hunk["old_count"] == 0:
+                # "@@ -N,0 ..." inserts after line N.
+                expected = max(0, hunk["old_start"] + drift)
+
+            found = None
+            previous_body = None
+            for fuzz in range(0, self.fuzz + 1):
+                body, lead = self._trim_context(hunk["lines"], fuzz)
+                if body == previous_body:
+                    break
+                previous_body = body
+                old_lines = [text for op, text in body if op != "+"]
+                if fuzz and not old_lines:
+                    # Nothing left to match: the hunk would land at its header position unchecked.
+                    break
+                pos = self._find_hunk(
+                    old_lines, file_lines, fingerprints, positions, expected + lead, copied_to
+                )
+                if pos is not None:
+                    found = (pos, body, fuzz, lead)
+                    break
+
+            if found is None:
+                old_preview = "\n".join(text for op, text in hunk["lines"] if op != "+")
+                return None, [
+                    f"hunk #{number} (@@ -{hunk['old_start']},{hunk['old_count']} @@) does not match "
+                    f"the file, even with fuzz {self.fuzz}. Expected lines:\n{old_preview}"
+                ]
+
+            pos, body, fuzz, lead = found
+            out.extend(file_lines[copied_to:pos])
+            i = pos
+            for op, text in body:
+                if op == " ":
+                    out.append(file_lines[i])
+                    i += 1
+                elif op == "-":
+                    i += 1
+                else:
+                    out.append(text + newline)
+            copied_to = i
+
+            applied_at = pos - lead
+            moved = applied_at - (hunk["old_start"] - 1)
+            if hunk["old_count"] == 0:
+                moved = applied_at - hunk["old_start"]
+            drift = moved
+            if moved or fuzz:
+                details = []
+                if moved:
+                    details.append(f"offset {moved:+d} lines")
+                if fuzz:
+                    details.append(f"fuzz {fuzz}")
+                notes.append(f"hunk #{number} applied with {', '.join(details)}")
+
+        out.extend(file_lines[copied_to:])
+        # A former last line without a newline may now be followed by more lines.
+        for k in range(len(out) - 1):
+            if not out[k].endswith(("\n", "\r")):
+                out[k] += newline
+        return out, notes
+
+    def execute(self, path: Optional[str] = None, patch: str = "", dry_run: bool = False) -> str:
         try:
             patch_text = self._strip_code_fences(str(patch or ""))
             if not patch_text:
                 return "Error: 'patch' is required."
 
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
-                    raw = f.read()
-                newline = self._detect_newline(raw)
-                lines = raw.splitlines(keepends=True)
-            else:
-                newline = "\n"
-                lines = []
-
-            hunks = self._parse_hunks(patch_text)
-            if not hunks:
+            file_patches = self._parse_patch(patch_text)
+            if not file_patches:
                 return "Error: No hunks found in patch."
+            if path and len(file_patches) > 1:
+                return (
+                    "Error: 'path' was given but the patch touches "
+                    f"{len(file_patches)} files; omit 'path' to use the patch headers."
+                )
+
+            # Every file is patched in memory first, so nothing is written unless all apply.
+            # Working copies are keyed by resolved path: a later section for the same file
+            # applies to the text the earlier ones produced (None: deleted).
+            working: Dict[str, Tuple[str, Optional[str], str, List[str]]] = {}
+            for entry in file_patches:
+                target, creates, deletes = self._resolve_path(entry)
+                if path:
+                    target = path
+                if not target:
+                    return "Error: 'path' is required when the patch has no ---/+++ file headers."
+
+                key = os.path.realpath(target)
+                earlier_notes: List[str] = []
+                if key in working:
+                    _, raw, newline, earlier_notes = working[key]
+                    exists = raw is not None
+                elif os.path.exists(target):
+                    with open(target, "r", encoding="utf-8", errors="replace", newline="") as f:
+                        raw = f.read()
+                    newline = self._detect_newline(raw)
+                    exists = True
+                else:
+                    raw, newline, exists = None, "\n", False
 
-            offset = 0
-            for hunk in hunks:
-                old_start = int(hunk["old_start"])
-                idx = max(0, (old_start - 1) + offset)
-
-                out_chunk: List[str] = []
-                i = idx
-
-                for op, text in hunk["lines"]:
-                    if op in {" ", "-"}:
-                        if i >= len(lines):
-                            return (
-                                "Error applying patch: file is shorter than expected at "
-                                f"line {i + 1}."
-                            )
-
-                        current_line = lines[i]
-                        if self._normalize(current_line) != self._normalize(text):
-                            return (
-                                "Error applying patch: context mismatch at "
-                                f"line {i + 1}.\n"
-                                f"Expected: {text!r}\n"
-                                f"Found: {current_line.rstrip('\r\n')!r}"
-                            )
-
-                        if op == " ":
-                            out_chunk.append(current_line)
-                        i += 1
-                        continue
-
-                    if op == "+":
-                        out_chunk.append(text + newline)
-                        continue
-
-                # Replace the affected range.
-                lines[idx:i] = out_chunk
-                offset += len(out_chunk) - (i - idx)
+                if exists:
+                    if creates and entry["hunks"][0]["old_count"] == 0:
+                        return f"Error applying patch: {target} already exists."
+                    lines = raw.splitlines(keepends=True)
+                else:
+                    if not creates and any(h["old_count"] for h in entry["hunks"]):
+                        return f"Error applying patch: {target} does not exist."
+                    lines = []
+
+                new_lines, notes = self._apply_hunks(lines, entry["hunks"], newline)
+                if new_lines is None:
+                    return f"Error applying patch to {target}: {notes[0]}"
+
+                content = "".join(new_lines)
+                if deletes and content:
+                    return f"Error applying patch: {target} is not empty after removing its lines."
+                working[key] = (target, None if deletes else content, newline, earlier_notes + notes)
+
+            results = [(target, content, notes) for target, content, _, notes in working.values()]
 
             if bool(dry_run):
-                return f"Patch can be applied cleanly to {path} (dry_run=true)."
+                targets = ", ".join(target for target, _, _ in results)
+                return f"Patch can be applied cleanly to {targets} (dry_run=true)."
+
+            for target, content, _ in results:
+                if content is None:
+                    remove_file(target)
+                    continue
+                atomic_write(target, content, newline="")
 
-            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-            with open(path, "w", encoding="utf-8", newline="") as f:
-                f.write("".join(lines))
+            if len(results) == 1:
+                target, content, notes = results[0]
+                verb = "deleted" if content is None else "applied patch to"
+                message = f"Successfully {verb} {target}."
+                if notes:
+                    message += " " + "; ".join(notes) + "."
+                return message
 
-            return f"Successfully applied patch to {path}."
+            report = [f"Successfully applied patch to {len(results)} files:"]
+            for target, content, notes in results:
+                line = f"- {target}" + (" (deleted)" if content is None else "")
+                if notes:
+                    line += ": " + "; ".join(notes)
+                report.append(line)
+            return "\n".join(report)
         except Exception as e:
             return f"Error applying patch: {str(e)}"
 
@@ -149,19 +372,19 @@ class ApplyPatchTool(Tool):
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "path": {
+                    "patch": {
                         "type": "string",
-                        "description": "File path to patch."
+                        "description": "Unified diff patch text (hunks with @@ headers). May cover several files via 'diff --git' or ---/+++ headers."
                     },
-                    "patch": {
+                    "path": {
                         "type": "string",
-                        "description": "Unified diff patch text (hunks with @@ headers)."
+                        "description": "File path to patch. Optional when the patch has ---/+++ file headers."
                     },
                     "dry_run": {
                         "type": "boolean",
                         "description": "Validate patch without writing (default: false)."
                     },
                 },
-                "required": ["path", "patch"],
+                "required": ["patch"],
             },
         }
@@ -1,6 +1,21 @@
 import os
+import re
 from typing import Dict, Any, Optional
 from ..core import Tool
+from ..transactions import atomic_write, open_atomic
+
+# Literal edits of files at least this large are streamed instead of loaded whole.
+STREAM_MIN_BYTES = int(os.getenv("AI_CONGRESS_EDIT_STREAM_MIN_BYTES", str(8 * 1024 * 1024)))
+STREAM_CHUNK_CHARS = 1024 * 1024
+
+
+class _AbortEdit(Exception):
+    """Raised inside a streamed edit to discard the temporary output."""
+
+    def __init__(self, count: int):
+        super().__init__(count)
+        self.count = count
+
 
 class EditFileTool(Tool):
     @property
@@ -11,16 +26,46 @@ class EditFileTool(Tool):
     def description(self) -> str:
         return "Smartly edit a file by replacing a unique block of text with new content. Use this for large files to avoid rewriting the whole file."
 
+    def _stream_replace(self, path: str, pattern: "re.Pattern", target_len: int, replacement_text: str, replace_all: bool) -> int:
+        """
+        Replaces matches of a fixed-length pattern chunk by chunk, writing to a temp file
+        that replaces `path` only on success. Peak memory is one chunk plus the target.
+        Without replace_all the scan stops at the second match.
+        """
+        count = 0
+        # The source is closed before the temp file replaces it (required on Windows).
+        with open_atomic(path) as dst, open(path, 'r', encoding='utf-8', errors='replace') as src:
+            carry = ""
+            while True:
+                chunk = src.read(STREAM_CHUNK_CHARS)
+                at_eof = not chunk
+                buffer = carry + chunk
+                # Matches starting before `safe` lie entirely inside the buffer.
+                safe = len(buffer) if at_eof else len(buffer) - target_len + 1
+                pos = 0
+                for match in pattern.finditer(buffer):
+                    if match.start() >= safe:
+                        break
+                    count += 1
+                    if count > 1 and not replace_all:
+                        raise _AbortEdit(count)
+                    dst.write(buffer[pos:match.start()])
+                    dst.write(match.expand(replacement_text))
+                    pos = match.end()
+                emit_to = max(pos, safe)
+                dst.write(buffer[pos:emit_to])
+                carry = buffer[emit_to:]
+                if at_eof:
+                    break
+            if count == 0:
+                raise _AbortEdit(0)
+        return count
+
     def execute(self, path: str, target_text: str, replacement_text: str, regex: bool = False, case_insensitive: bool = False, replace_all: bool = False) -> str:
         try:
             if not os.path.exists(path):
                 return f"Error: File '{path}' does not exist."
 
-            with open(path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-
-            import re
-            
             flags = 0
             if case_insensitive:
                 flags |= re.IGNORECASE
@@ -29,11 +74,22 @@ class EditFileTool(Tool):
                 pattern = target_text
             else:
                 pattern = re.escape(target_text)
-            
-            # Check for occurrences
-            matches = list(re.finditer(pattern, content, flags=flags))
-            count = len(matches)
-            
+
+            if not regex and target_text and os.path.getsize(path) >= STREAM_MIN_BYTES:
+                # Escaped literals match exactly len(target_text) characters, even case-insensitively.
+                try:
+                    count = self._stream_replace(path, re.compile(pattern, flags), len(target_text), replacement_text, replace_all)
+                except _AbortEdit as e:
+                    count = e.count
+                    new_content = None
+                else:
+                    return f"Successfully edited {path}. Replaced {count} occurrence(s)."
+            else:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                # One pass counts and replaces; nothing is written unless the count is acceptable.
+                new_content, count = re.subn(pattern, replacement_text, content, flags=flags)
+
             if count == 0:
                 return (
                     f"Error: 'target_text' not found in {path}. "
@@ -42,22 +98,14 @@ class EditFileTool(Tool):
                 )
             
             if count > 1 and not replace_all:
+                found = f"{count} times" if new_content is not None else "more than once"
                 return (
-                    f"Error: 'target_text' found {count} times in {path}. "
+                    f"Error: 'target_text' found {found} in {path}. "
                     "Please provide a more unique block of text (more context) to identify the section to replace, "
                     "or set replace_all=True to replace all occurrences."
                 )
 
-            # Perform replacement
-            # If replace_all is True, re.sub replaces all.
-            # If replace_all is False, we already checked count == 1, so re.sub is fine (it replaces all, which is just 1).
-            # However, re.sub might be risky if we only want to replace the *first* one but count > 1 (which we blocked above).
-            # So re.sub is safe here given the checks.
-            
-            new_content = re.sub(pattern, replacement_text, content, flags=flags)
-            
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            atomic_write(path, new_content)
                 
             return f"Successfully edited {path}. Replaced {count} occurrence(s)."
 
@@ -0,0 +1,95 @@
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Tuple
+
+# Files at least this large are scanned through mmap instead of buffered reads.
+MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+
+class LineOffsetIndex:
+    """
+    Sparse line-start offsets for one version of a file.
+
+    offsets[k] is the byte offset where line k * stride + 1 begins. The index is
+    extended lazily, only as far as the furthest line requested so far, so paging
+    through a file scans each byte once in total.
+    """
+
+    def __init__(self, path: str, mtime_ns: int, size: int, stride: int = 1024):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.stride = stride
+        self.offsets = array("Q", [0])
+        self._scanned_to = 0
+        self._lines_before = 0
+        self._lock = threading.Lock()
+
+    def _record(self, chunk: bytes, base: int) -> None:
+        """Counts newlines in a chunk starting at byte `base`, recording every stride-th line start."""
+        remaining = chunk.count(b"\n")
+        pos = 0
+        while True:
+            needed = len(self.offsets) * self.stride - self._lines_before
+            if remaining < needed:
+                self._lines_before += remaining
+                return
+            for _ in range(needed):
+                pos = chunk.find(b"\n", pos) + 1
+            remaining -= needed
+            self._lines_before += needed
+            self.offsets.append(base + pos)
+
+    def _extend(self, target_checkpoint: int) -> None:
+        if self._scanned_to >= self.size:
+            return
+        with open(self.path, "rb") as f:
+            if self.size >= MMAP_THRESHOLD_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    while len(self.offsets) <= target_checkpoint and self._scanned_to < self.size:
+                        end = min(self.size, self._scanned_to + SCAN_CHUNK_BYTES)
+                        self._record(mm[self._scanned_to:end], self._scanned_to)
+                        self._scanned_to = end
+                return
+
+            f.seek(self._scanned_to)
+            while len(self.offsets) <= target_checkpoint and self._scanned_to < self.size:
+                chunk = f.read(SCAN_CHUNK_BYTES)
+                if not chunk:
+                    break
+                self._record(chunk, self._scanned_to)
+                self._scanned_to += len(chunk)
+
+    def seek_point(self, line: int) -> Tuple[int, int]:
+        """Returns (line_number, byte_offset) of the closest known line start at or before line."""
+        target_checkpoint = max(0, (line - 1) // self.stride)
+        with self._lock:
+            if target_checkpoint >= len(self.offsets):
+                self._extend(target_checkpoint)
+            checkpoint = min(target_checkpoint, len(self.offsets) - 1)
+            return checkpoint * self.stride + 1, self.offsets[checkpoint]
+
+
+class LineIndexCache:
+    """Bounded cache of LineOffsetIndex objects keyed by (path, mtime, size)."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, LineOffsetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, st: os.stat_result) -> LineOffsetIndex:
+        key = os.path.abspath(path)
+        with self._lock:
+            index = self._entries.get(key)
+            if index is None or index.mtime_ns != st.st_mtime_ns or index.size != st.st_size:
+                index = LineOffsetIndex(key, st.st_mtime_ns, st.st_size)
+                self._entries[key] = index
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return index
@@ -7,6 +7,10 @@ class ListDirectoryTool(Tool):
     def name(self) -> str:
         return "list_directory"
 
+    @property
+    def read_only(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "List files and directories in a given path. Use this to explore the file system or find specific files."
@@ -1,6 +1,6 @@
-import os
 from typing import Dict, Any
 from ..core import Tool
+from ..transactions import atomic_write
 
 class ModifyFileTool(Tool):
     @property
@@ -13,13 +13,8 @@ class ModifyFileTool(Tool):
 
     def execute(self, path: str, content: str) -> str:
         try:
-            # Create parent directories if they don't exist
-            directory = os.path.dirname(path)
-            if directory:
-                os.makedirs(directory, exist_ok=True)
-                
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Parent directories are created by the atomic write if they don't exist
+            atomic_write(path, content)
             return f"Successfully wrote to {path}"
         except Exception as e:
             return f"Error writing to file: {str(e)}"
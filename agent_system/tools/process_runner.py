@@ -0,0 +1,192 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class OutputBuffer:
+    """
+    Keeps the first `head_bytes` and the last `tail_bytes` of a stream.
+
+    Memory stays bounded by head_bytes + tail_bytes no matter how much is written;
+    `total` counts every byte seen.
+    """
+
+    def __init__(self, head_bytes: int = 32 * 1024, tail_bytes: int = 32 * 1024):
+        self.head_bytes = max(0, int(head_bytes))
+        self.tail_bytes = max(0, int(tail_bytes))
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data and self.tail_bytes:
+            self._tail += data
+            if len(self._tail) > self.tail_bytes:
+                del self._tail[: len(self._tail) - self.tail_bytes]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self._head) + len(self._tail)
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self._head) - len(self._tail)
+
+    def last_line(self) -> str:
+        data = self._tail or self._head
+        lines = bytes(data).decode("utf-8", errors="replace").strip().splitlines()
+        return lines[-1] if lines else ""
+
+    def text(self) -> str:
+        head = bytes(self._head).decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + bytes(self._tail).decode("utf-8", errors="replace")
+        tail = bytes(self._tail).decode("utf-8", errors="replace")
+        return f"{head}\n[... {self.omitted} bytes omitted ...]\n{tail}"
+
+
+class CommandResult:
+    def __init__(self, exit_code: Optional[int], stdout: OutputBuffer, stderr: OutputBuffer, timed_out: Optional[str], duration_s: float):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out  # None, "wall" or "idle"
+        self.duration_s = duration_s
+
+
+def _popen_kwargs() -> dict:
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    # A new session makes the child a process-group leader, so the whole tree can be killed.
+    return {"start_new_session": True}
+
+
+def kill_process_tree(proc: subprocess.Popen, grace_s: float = 2.0) -> None:
+    """Terminates the process and everything it spawned (its process group)."""
+    if os.name == "nt":
+        if proc.poll() is None:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        return
+    # start_new_session made the child the group leader, so its pid is the group id;
+    # the group can outlive the leader when background children remain.
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        return
+    try:
+        proc.wait(timeout=grace_s)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def run_command(
+    argv: List[str],
+    timeout_s: Optional[float] = None,
+    idle_timeout_s: Optional[float] = None,
+    on_output: Optional[Callable[[OutputBuffer, OutputBuffer], None]] = None,
+    head_bytes: int = 32 * 1024,
+    tail_bytes: int = 32 * 1024,
+    cwd: Optional[str] = None,
+) -> CommandResult:
+    """
+    Runs argv, reading stdout and stderr incrementally into bounded buffers.
+
+    The process group is killed when `timeout_s` elapses (wall clock) or when no output
+    arrives for `idle_timeout_s`. `on_output` is called from the waiting thread at most
+    ten times per second while output keeps arriving.
+    """
+    stdout = OutputBuffer(head_bytes, tail_bytes)
+    stderr = OutputBuffer(head_bytes, tail_bytes)
+    lock = threading.Lock()
+    last_output = [time.monotonic()]
+
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        argv,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        **_popen_kwargs(),
+    )
+
+    def pump(pipe, buffer: OutputBuffer) -> None:
+        fd = pipe.fileno()
+        try:
+            while True:
+                data = os.read(fd, READ_CHUNK_BYTES)
+                if not data:
+                    break
+                with lock:
+                    buffer.write(data)
+                    last_output[0] = time.monotonic()
+        except OSError:
+            pass
+        finally:
+            pipe.close()
+
+    readers = [
+        threading.Thread(target=pump, args=(proc.stdout, stdout), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = None
+    reported = 0
+    try:
+        while True:
+            try:
+                proc.wait(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if timeout_s and now - start > timeout_s:
+                timed_out = "wall"
+            elif idle_timeout_s and now - last_output[0] > idle_timeout_s:
+                timed_out = "idle"
+            if timed_out:
+                kill_process_tree(proc)
+                break
+            if on_output is not None:
+                with lock:
+                    seen = stdout.total + stderr.total
+                    if seen != reported:
+                        reported = seen
+                        on_output(stdout, stderr)
+    except BaseException:
+        # The child runs in its own session, so Ctrl-C does not reach it; stop it here.
+        kill_process_tree(proc)
+        raise
+
+    # Background children that inherited the pipes can keep them open after the shell exits.
+    for reader in readers:
+        reader.join(timeout=1.0)
+    if any(reader.is_alive() for reader in readers):
+        kill_process_tree(proc)
+        for reader in readers:
+            reader.join(timeout=1.0)
+
+    exit_code = proc.poll()
+    with lock:
+        return CommandResult(exit_code, stdout, stderr, timed_out, time.monotonic() - start)
@@ -1,12 +1,23 @@
+import io
 import os
 from typing import Dict, Any
 from ..core import Tool
+from .line_index import LineIndexCache
+
+# Files smaller than this are read from the start; the index only pays off for big files.
+LINE_INDEX_MIN_BYTES = 256 * 1024
+
+_line_indexes = LineIndexCache()
 
 class ReadFileTool(Tool):
     @property
     def name(self) -> str:
         return "read_file"
 
+    @property
+    def read_only(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Read a slice of a file (safe for large files). Use start_line/max_lines to paginate."
@@ -34,17 +45,28 @@ class ReadFileTool(Tool):
             max_lines = min(max_lines, 2000)
             max_chars = min(max_chars, 200000)
 
-            file_size = os.path.getsize(path)
+            st = os.stat(path)
+            file_size = st.st_size
+
+            first_line, offset = 1, 0
+            if file_size >= LINE_INDEX_MIN_BYTES:
+                first_line, offset = _line_indexes.get(path, st).seek_point(start_line)
 
             lines_out = []
             char_count = 0
             truncated = False
             next_start_line = None
 
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                for line_num, line in enumerate(f, start=1):
+            raw = open(path, "rb")
+            raw.seek(offset)
+            # Lines split on "\n" only, as the line index counts them, so numbering does
+            # not depend on whether the index was used.
+            with io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="\n") as f:
+                for line_num, line in enumerate(f, start=first_line):
                     if line_num < start_line:
                         continue
+                    if line.endswith("\r\n"):
+                        line = line[:-2] + "\n"
 
                     if bool(with_line_numbers):
                         formatted = f"{line_num:>6} | {line}"
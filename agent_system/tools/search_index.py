@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Set
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+    from re._constants import LITERAL, SUBPATTERN
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+    from sre_constants import LITERAL, SUBPATTERN
+
+# Files larger than this are not indexed; they are always scanned.
+MAX_INDEXED_FILE_BYTES = 4 * 1024 * 1024
+
+
+def default_index_path(root: str) -> str:
+    base = os.getenv("AI_CONGRESS_SEARCH_INDEX_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ai_congress", "search_index"
+    )
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(base, f"{digest}.sqlite")
+
+
+def text_trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {"".join(t) for t in set(zip(text, text[1:], text[2:]))}
+
+
+def _required_literal_runs(tokens) -> List[str]:
+    """Literal runs that every match of a parsed (sub)pattern must contain."""
+    runs: List[str] = []
+    current: List[str] = []
+    for op, arg in tokens:
+        if op == LITERAL:
+            current.append(chr(arg))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+        if op == SUBPATTERN:
+            # (group, add_flags, del_flags, pattern): a plain group is required as a whole.
+            runs.extend(_required_literal_runs(arg[-1]))
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def query_trigrams(pattern: str, regex: bool) -> Set[str]:
+    """
+    Trigrams that must appear in any line matching the query.
+    An empty set means the query cannot be narrowed (e.g. top-level alternation).
+    """
+    if not regex:
+        return text_trigrams(pattern)
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return set()
+    trigrams: Set[str] = set()
+    for run in _required_literal_runs(list(parsed)):
+        trigrams |= text_trigrams(run)
+    return trigrams
+
+
+class TrigramIndex:
+    """
+    Persistent trigram index (SQLite) for the files under one root directory.
+
+    Files are re-indexed only when their mtime or size changes. Trigrams are
+    lower-cased, so a lookup yields a superset of the files that can match both
+    case-sensitive and case-insensitive queries; the regex still decides the result.
+    """
+
+    def __init__(self, root: str, path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.path = path or default_index_path(self.root)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
+        self._db = self._connect()
+        with self._lock:
+            self._db.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    indexed INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    trigram TEXT NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    PRIMARY KEY (trigram, file_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_file ON postings(file_id);
+                """
+            )
+            self._db.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+
+    def is_built(self) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def is_building(self) -> bool:
+        return self._build_thread is not None and self._build_thread.is_alive()
+
+    def _index_file(self, db: sqlite3.Connection, file_path: str, st: os.stat_result) -> None:
+        trigrams: Set[str] = set()
+        indexed = 0
+        if st.st_size <= MAX_INDEXED_FILE_BYTES:
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+                if b"\x00" not in data[:4096]:
+                    trigrams = text_trigrams(data.decode("utf-8", errors="replace"))
+                # Binary files are recorded as indexed with no trigrams: they never match.
+                indexed = 1
+            except OSError:
+                indexed = 0
+
+        db.execute(
+            "INSERT INTO files (path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, indexed = excluded.indexed",
+            (file_path, st.st_mtime_ns, st.st_size, indexed),
+        )
+        (file_id,) = db.execute("SELECT id FROM files WHERE path = ?", (file_path,)).fetchone()
+        db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        if trigrams:
+            db.executemany(
+                "INSERT OR IGNORE INTO postings (trigram, file_id) VALUES (?, ?)",
+                ((t, file_id) for t in trigrams),
+            )
+
+    def refresh(self, files: Iterable[str]) -> int:
+        """Re-indexes files whose mtime/size changed (or that are new). Returns how many."""
+        changed = 0
+        for file_path in files:
+            file_path = os.path.abspath(file_path)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            # Point lookups on the path index: the files table is never loaded as a whole.
+            with self._lock:
+                known = self._db.execute("SELECT mtime_ns, size FROM files WHERE path = ?", (file_path,)).fetchone()
+            if known == (st.st_mtime_ns, st.st_size):
+                continue
+            # Lock per file so queries are never blocked behind a long (re)build.
+            with self._lock:
+                self._index_file(self._db, file_path, st)
+                changed += 1
+                if changed % 200 == 0:
+                    self._db.commit()
+        if changed:
+            with self._lock:
+                self._db.commit()
+        return changed
+
+    def build(self, files: Iterable[str]) -> None:
+        """Indexes every file and drops entries for files that no longer exist."""
+        files = [os.path.abspath(f) for f in files]
+        self.refresh(files)
+        with self._lock:
+            present = set(files)
+            stale = [
+                (file_id,)
+                for file_id, path in self._db.execute("SELECT id, path FROM files")
+                if path not in present
+            ]
+            self._db.executemany("DELETE FROM postings WHERE file_id = ?", stale)
+            self._db.executemany("DELETE FROM files WHERE id = ?", stale)
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', '1')")
+            self._db.commit()
+
+    def build_in_background(self, files: Iterable[str]) -> None:
+        """Builds the index on a daemon thread; `files` (e.g. a directory walk) is consumed there too."""
+        if self.is_building():
+            return
+        self._build_thread = threading.Thread(target=self.build, args=(files,), name="search-index-build", daemon=True)
+        self._build_thread.start()
+
+    def filter(self, files: List[str], trigrams: Set[str]) -> List[str]:
+        """
+        Keeps the files that may contain every trigram: indexed files holding all of
+        them, plus files the index could not cover (too large or unreadable). Only
+        those two sets are read from SQLite, so the cost follows the matches rather
+        than the size of the index. `files` must have been passed to `refresh` first.
+        Order is preserved.
+        """
+        if not trigrams:
+            return files
+        trigrams_list = sorted(trigrams)
+        placeholders = ",".join("?" for _ in trigrams_list)
+        with self._lock:
+            keep = {
+                path
+                for (path,) in self._db.execute(
+                    "SELECT f.path FROM postings p JOIN files f ON f.id = p.file_id "
+                    f"WHERE p.trigram IN ({placeholders}) GROUP BY p.file_id HAVING COUNT(*) = ? "
+                    "UNION SELECT path FROM files WHERE indexed = 0",
+                    (*trigrams_list, len(trigrams_list)),
+                )
+            }
+        return [f for f in files if os.path.abspath(f) in keep]
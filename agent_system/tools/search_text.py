@@ -1,16 +1,47 @@
 import fnmatch
 import os
-import re
-from typing import Any, Dict, Iterable, List
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional
 
 from ..core import Tool
+from ..search_worker import build_matcher, init_worker, scan_chunk, search_file
+from .search_index import TrigramIndex, query_trigrams
 
 
 class SearchTextTool(Tool):
+    # Files handed to one worker at a time in parallel mode.
+    CHUNK_SIZE = 16
+    # Below this many files a process pool costs more than it saves.
+    PARALLEL_MIN_FILES = 256
+    # Parallel scans that may share the pool at once; each has its own chunk window.
+    MAX_CONCURRENT_SCANS = 8
+
+    def __init__(self, use_index: Optional[bool] = None, workers: Optional[int] = None):
+        if use_index is None:
+            use_index = os.getenv("AI_CONGRESS_SEARCH_INDEX", "0") == "1"
+        if workers is None:
+            workers = int(os.getenv("AI_CONGRESS_SEARCH_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+        self.use_index = bool(use_index)
+        self.workers = max(1, int(workers))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._scan_window = None
+        self._next_chunk_id = 0
+        self._pool_lock = threading.Lock()
+        self._free_slots = list(range(self.MAX_CONCURRENT_SCANS))
+        self._slot_available = threading.Semaphore(self.MAX_CONCURRENT_SCANS)
+        self._indexes: Dict[str, TrigramIndex] = {}
+
     @property
     def name(self) -> str:
         return "search_text"
 
+    @property
+    def read_only(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Search for a text/regex pattern in files (grep-like). Returns matching file:line results."
@@ -32,21 +63,122 @@ class SearchTextTool(Tool):
             "build",
         }
 
+        # Sorted walk: results come back in a stable, path-ordered sequence.
         for root, dirs, files in os.walk(path):
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            dirs[:] = sorted(d for d in dirs if d not in ignore_dirs)
 
-            for filename in files:
+            for filename in sorted(files):
                 if include_globs and not any(fnmatch.fnmatch(filename, g) for g in include_globs):
                     continue
                 yield os.path.join(root, filename)
 
-    def _is_binary_file(self, file_path: str) -> bool:
+    def _candidate_files(self, path: str, include_globs: List[str], pattern: str, regex: bool) -> Iterable[str]:
+        """
+        Files to scan. With the trigram index enabled and warm, only files that can
+        contain the query's required trigrams are returned; while the index is cold
+        every file is scanned and the index is built in the background.
+        """
+        if not self.use_index or not os.path.isdir(path):
+            return self._iter_files(path, include_globs)
+
+        root = os.path.abspath(path)
+        index = self._indexes.get(root)
+        if index is None:
+            index = TrigramIndex(root)
+            self._indexes[root] = index
+
+        if not index.is_built():
+            index.build_in_background(self._iter_files(path, []))
+            return self._iter_files(path, include_globs)
+
+        files = list(self._iter_files(path, include_globs))
+        index.refresh(files)
+        return index.filter(files, query_trigrams(pattern, regex))
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forkserver/spawn: the agent process runs threads, which fork() does not mix well with.
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if self._scan_window is None:
+                # One [first, last] live chunk-id window per scan slot.
+                self._scan_window = ctx.Array("q", [0, -1] * self.MAX_CONCURRENT_SCANS)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=ctx,
+                initializer=init_worker,
+                initargs=(self._scan_window,),
+            )
+        return self._executor
+
+    def _scan_parallel(self, files: List[str], base_path: str, query: tuple, max_results: int) -> List[str]:
+        """
+        Scans chunks of files on a process pool, keeping a small window of chunks in
+        flight. Once the finished prefix of chunks holds max_results matches, queued
+        chunks are cancelled and running workers stop at their next file (via a shared
+        chunk-id window). Results are concatenated in chunk (path) order, so the
+        output equals the sequential scan. Concurrent searches share the pool, each
+        in its own window slot; the lock is only held to set up the scan.
+        """
+        chunks = [files[i:i + self.CHUNK_SIZE] for i in range(0, len(files), self.CHUNK_SIZE)]
+        chunk_results: Dict[int, List[str]] = {}
+
+        self._slot_available.acquire()
+        with self._pool_lock:
+            executor = self._pool()
+            slot = self._free_slots.pop()
+            base = self._next_chunk_id
+            self._next_chunk_id += len(chunks)
+            with self._scan_window.get_lock():
+                self._scan_window[2 * slot] = base
+                self._scan_window[2 * slot + 1] = base + len(chunks) - 1
+
+        window = self.workers * 2
+        futures = {}
+        pending = set()
+        next_submit = 0
+        next_chunk = 0
+        total = 0
         try:
-            with open(file_path, "rb") as f:
-                chunk = f.read(4096)
-            return b"\x00" in chunk
-        except Exception:
-            return True
+            while True:
+                while next_submit < len(chunks) and len(pending) < window:
+                    future = executor.submit(
+                        scan_chunk, slot, base + next_submit, chunks[next_submit], base_path, query, max_results
+                    )
+                    futures[future] = next_submit
+                    pending.add(future)
+                    next_submit += 1
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_results[futures[future]] = future.result()
+
+                # Count matches over the contiguous prefix of finished chunks.
+                while next_chunk in chunk_results and total < max_results:
+                    total += len(chunk_results[next_chunk])
+                    next_chunk += 1
+
+                if total >= max_results:
+                    with self._scan_window.get_lock():
+                        self._scan_window[2 * slot + 1] = base + next_chunk - 1
+                    for future in pending:
+                        future.cancel()
+                    break
+        finally:
+            with self._scan_window.get_lock():
+                self._scan_window[2 * slot + 1] = -1
+            with self._pool_lock:
+                self._free_slots.append(slot)
+            self._slot_available.release()
+
+        results: List[str] = []
+        for i in range(len(chunks)):
+            if i not in chunk_results or len(results) >= max_results:
+                break
+            results.extend(chunk_results[i][: max_results - len(results)])
+        return results
 
     def execute(
         self,
@@ -71,40 +203,25 @@ class SearchTextTool(Tool):
             if not os.path.exists(path):
                 return f"Error: Path does not exist: {path}"
 
-            flags = 0 if bool(case_sensitive) else re.IGNORECASE
-            compiled = re.compile(pattern, flags=flags) if bool(regex) else None
-
-            results: List[str] = []
-            truncated = False
-
+            query = (pattern, bool(regex), bool(case_sensitive))
+            # Compile up front so an invalid regex is reported before any file is read.
+            matcher = build_matcher(*query)
             base_path = os.path.abspath(path if os.path.isdir(path) else os.path.dirname(path) or ".")
 
-            for file_path in self._iter_files(path, include_globs):
-                if self._is_binary_file(file_path):
-                    continue
-
+            files = list(self._candidate_files(path, include_globs, pattern, bool(regex)))
+            results = None
+            if self.workers > 1 and len(files) >= self.PARALLEL_MIN_FILES:
                 try:
-                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                        for line_num, line in enumerate(f, start=1):
-                            haystack = line if bool(case_sensitive) else line.lower()
-                            needle = pattern if bool(case_sensitive) else pattern.lower()
-                            matched = (
-                                bool(compiled.search(line)) if compiled else (needle in haystack)
-                            )
-                            if not matched:
-                                continue
-
-                            rel = os.path.relpath(file_path, start=base_path)
-                            preview = line.rstrip("\r\n")
-                            results.append(f"{rel}:{line_num}: {preview}")
-                            if len(results) >= max_results:
-                                truncated = True
-                                break
-                except Exception:
-                    continue
-
-                if truncated:
-                    break
+                    results = self._scan_parallel(files, base_path, query, max_results)
+                except BrokenProcessPool:
+                    self._executor = None
+            if results is None:
+                results = []
+                for file_path in files:
+                    results.extend(search_file(file_path, base_path, matcher, max_results - len(results)))
+                    if len(results) >= max_results:
+                        break
+            truncated = len(results) >= max_results
 
             header = (
                 f"[search_text] pattern={pattern!r} path={path!r} results={len(results)} "
@@ -0,0 +1,215 @@
+import os
+import queue
+import secrets
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from .process_runner import READ_CHUNK_BYTES, CommandResult, OutputBuffer, kill_process_tree
+
+
+class _MarkerScanner:
+    """
+    Copies one stream into an OutputBuffer until the line "\\n<marker><suffix>\\n".
+
+    Bytes that could be the start of the marker are held back, so the marker never
+    reaches the buffer even when it is split across reads.
+    """
+
+    def __init__(self, marker: bytes, buffer: OutputBuffer):
+        self.marker = b"\n" + marker
+        self.buffer = buffer
+        self.pending = b""
+        self.suffix: Optional[bytes] = None
+
+    @property
+    def done(self) -> bool:
+        return self.suffix is not None
+
+    def feed(self, data: bytes) -> None:
+        data = self.pending + data
+        idx = data.find(self.marker)
+        if idx >= 0:
+            self.buffer.write(data[:idx])
+            rest = data[idx:]
+            end = rest.find(b"\n", len(self.marker))
+            if end < 0:
+                self.pending = rest
+                return
+            self.pending = b""
+            self.suffix = rest[len(self.marker):end].strip()
+            return
+        keep = len(self.marker) - 1
+        if len(data) > keep:
+            self.buffer.write(data[:-keep])
+            data = data[-keep:]
+        self.pending = data
+
+    def flush(self) -> None:
+        """Commits held-back bytes (used when the stream ends without a marker)."""
+        self.buffer.write(self.pending)
+        self.pending = b""
+
+
+class ShellSession:
+    """
+    A long-lived /bin/sh that runs commands one at a time.
+
+    Each command runs through `command eval` (a syntax error does not end the shell)
+    with stdin from /dev/null (it cannot swallow the framing), followed by a random
+    sentinel line on stdout carrying the exit status and one on stderr; a command is
+    complete once both sentinels arrive. `cd`, exported variables and sourced scripts
+    persist between commands. A command that times out kills the whole session; the
+    next command starts a fresh shell.
+    """
+
+    def __init__(self, shell: str = "/bin/sh", cwd: Optional[str] = None):
+        self.shell = shell
+        self.cwd = cwd
+        self._proc: Optional[subprocess.Popen] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self) -> None:
+        self._queue = queue.Queue()
+        self._proc = subprocess.Popen(
+            [self.shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=True,
+        )
+        for name, pipe in (("out", self._proc.stdout), ("err", self._proc.stderr)):
+            threading.Thread(
+                target=self._pump, args=(name, pipe, self._queue), name=f"shell-session-{name}", daemon=True
+            ).start()
+
+    @staticmethod
+    def _pump(name: str, pipe, sink: "queue.Queue") -> None:
+        fd = pipe.fileno()
+        try:
+            while True:
+                data = os.read(fd, READ_CHUNK_BYTES)
+                if not data:
+                    break
+                sink.put((name, data))
+        except OSError:
+            pass
+        finally:
+            sink.put((name, None))
+            pipe.close()
+
+    def kill(self) -> None:
+        with self._lock:
+            self._kill()
+
+    def _kill(self) -> None:
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            kill_process_tree(self._proc)
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._proc = None
+
+    def reset(self) -> None:
+        """Discards the current shell (and its state); the next command starts a new one."""
+        self.kill()
+
+    def run(
+        self,
+        command: str,
+        timeout_s: Optional[float] = None,
+        idle_timeout_s: Optional[float] = None,
+        on_output: Optional[Callable[[OutputBuffer, OutputBuffer], None]] = None,
+        head_bytes: int = 32 * 1024,
+        tail_bytes: int = 32 * 1024,
+    ) -> CommandResult:
+        with self._lock:
+            if not self.alive:
+                self._kill()
+                self._start()
+            # Output that background jobs produced between commands is dropped.
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            marker = f"__AI_CONGRESS_DONE_{secrets.token_hex(8)}__"
+            quoted = "'" + command.replace("'", "'\\''") + "'"
+            script = (
+                f"command eval {quoted} < /dev/null\n"
+                "__ai_congress_status=$?\n"
+                f"printf '\\n{marker} %d\\n' \"$__ai_congress_status\"\n"
+                f"printf '\\n{marker}\\n' >&2\n"
+            )
+
+            stdout = OutputBuffer(head_bytes, tail_bytes)
+            stderr = OutputBuffer(head_bytes, tail_bytes)
+            scanners = {
+                "out": _MarkerScanner(marker.encode(), stdout),
+                "err": _MarkerScanner(marker.encode(), stderr),
+            }
+            start = last_output = last_report = time.monotonic()
+            proc = self._proc
+            try:
+                proc.stdin.write(script.encode("utf-8"))
+                proc.stdin.flush()
+            except OSError:
+                pass  # The shell died; its closed pipes are reported below.
+
+            timed_out = None
+            ended = set()
+            try:
+                while not all(s.done or name in ended for name, s in scanners.items()):
+                    try:
+                        name, data = self._queue.get(timeout=0.1)
+                    except queue.Empty:
+                        name, data = None, b""
+                    if name is not None:
+                        if data is None:
+                            ended.add(name)
+                            scanners[name].flush()
+                        else:
+                            scanners[name].feed(data)
+                            last_output = time.monotonic()
+
+                    now = time.monotonic()
+                    if timeout_s and now - start > timeout_s:
+                        timed_out = "wall"
+                    elif idle_timeout_s and now - last_output > idle_timeout_s:
+                        timed_out = "idle"
+                    if timed_out:
+                        self._kill()
+                        break
+                    if on_output is not None and data and now - last_report >= 0.1:
+                        last_report = now
+                        on_output(stdout, stderr)
+            except BaseException:
+                # Interrupted (e.g. Ctrl-C): the half-run command would corrupt the framing.
+                self._kill()
+                raise
+
+            exit_code: Optional[int] = None
+            status = scanners["out"].suffix
+            if status is not None:
+                try:
+                    exit_code = int(status)
+                except ValueError:
+                    exit_code = None
+            elif self._proc is not None:
+                # The command ended the shell itself (e.g. `exit 3`).
+                exit_code = self._proc.wait()
+                self._proc = None
+            elif proc is not None:
+                exit_code = proc.poll()
+            return CommandResult(exit_code, stdout, stderr, timed_out, time.monotonic() - start)
@@ -1,9 +1,28 @@
-import subprocess
+import os
 import platform
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..core import Tool
+from .process_runner import run_command
+from .shell_session import ShellSession
 
 class SystemShellTool(Tool):
+    def __init__(self, timeout_s: Optional[float] = None, idle_timeout_s: Optional[float] = None, max_output_bytes: Optional[int] = None, persistent: Optional[bool] = None):
+        if timeout_s is None:
+            timeout_s = float(os.getenv("AI_CONGRESS_SHELL_TIMEOUT_S", "600"))
+        if idle_timeout_s is None:
+            idle_timeout_s = float(os.getenv("AI_CONGRESS_SHELL_IDLE_TIMEOUT_S", "120"))
+        if max_output_bytes is None:
+            max_output_bytes = int(os.getenv("AI_CONGRESS_SHELL_MAX_OUTPUT_BYTES", str(64 * 1024)))
+        # Values <= 0 disable the corresponding timeout.
+        self.timeout_s = timeout_s if timeout_s > 0 else None
+        self.idle_timeout_s = idle_timeout_s if idle_timeout_s > 0 else None
+        self.max_output_bytes = max(1024, max_output_bytes)
+        if persistent is None:
+            persistent = os.getenv("AI_CONGRESS_SHELL_SESSION", "0") == "1"
+        # Sessions drive /bin/sh through pipes; PowerShell keeps the one-shot mode.
+        self.persistent = bool(persistent) and platform.system() != "Windows"
+        self._session: Optional[ShellSession] = None
+
     @property
     def name(self) -> str:
         return "system_shell"
@@ -12,28 +31,69 @@ class SystemShellTool(Tool):
     def description(self) -> str:
         return "Execute system shell commands. Use this for advanced tasks or when other tools fail. On Windows uses PowerShell, on Linux uses /bin/sh."
 
-    def execute(self, command: str) -> str:
+    def _progress(self, stdout, stderr) -> None:
+        if self.ui is None:
+            return
+        last_line = (stderr.last_line() if stderr.total and not stdout.total else stdout.last_line())[:80]
+        self.ui.update_status(
+            f"Executing {self.name}... {stdout.total + stderr.total} bytes | {last_line}"
+        )
+
+    def execute(self, command: str, timeout_s: Optional[float] = None, session_action: Optional[str] = None) -> str:
         try:
-            system = platform.system()
-            if system == "Windows":
-                shell_command = ["powershell", "-Command", command]
+            if session_action in ("reset", "kill"):
+                if self._session is not None:
+                    self._session.kill()
+                    self._session = None
+                if session_action == "kill" or not str(command or "").strip():
+                    return f"[system_shell] session {'killed' if session_action == 'kill' else 'reset'}"
+
+            timeout = float(timeout_s) if timeout_s is not None else self.timeout_s
+            # Half of the budget keeps the start of the output, half the end.
+            limits = dict(
+                timeout_s=timeout if timeout and timeout > 0 else None,
+                idle_timeout_s=self.idle_timeout_s,
+                on_output=self._progress,
+                head_bytes=self.max_output_bytes // 2,
+                tail_bytes=self.max_output_bytes - self.max_output_bytes // 2,
+            )
+
+            if self.persistent:
+                if self._session is None:
+                    self._session = ShellSession()
+                result = self._session.run(command, **limits)
             else:
-                shell_command = ["/bin/sh", "-c", command]
-                
-            result = subprocess.run(
-                shell_command, 
-                capture_output=True, 
-                text=True, 
-                check=False
+                system = platform.system()
+                if system == "Windows":
+                    shell_command = ["powershell", "-Command", command]
+                else:
+                    shell_command = ["/bin/sh", "-c", command]
+                result = run_command(shell_command, **limits)
+
+            output = result.stdout.text()
+            if result.stderr.total:
+                output += f"\nStderr: {result.stderr.text()}"
+
+            truncated = result.stdout.truncated or result.stderr.truncated
+            header = (
+                f"[system_shell] exit_code={result.exit_code} stdout_bytes={result.stdout.total} "
+                f"stderr_bytes={result.stderr.total} truncated={'true' if truncated else 'false'} "
+                f"duration_s={result.duration_s:.2f}"
             )
-            
-            output = result.stdout
-            if result.stderr:
-                output += f"\nStderr: {result.stderr}"
-                
-            return output.strip()
+            if result.timed_out == "wall":
+                header += f" timed_out=true (no exit after {timeout:g}s; process group killed)"
+            elif result.timed_out == "idle":
+                header += f" timed_out=true (no output for {self.idle_timeout_s:g}s; process group killed)"
+            if self.persistent and not self._session.alive:
+                header += " session_ended=true (shell state was lost; the next command starts a new session)"
+
+            return header + "\n" + output.strip()
         except Exception as e:
             return f"Error executing shell command: {str(e)}"
+        finally:
+            # The progress line must not outlive the command, whether it finished or raised.
+            if self.ui is not None:
+                self.ui.stop_status()
 
     def to_schema(self) -> Dict[str, Any]:
         return {
@@ -45,6 +105,15 @@ class SystemShellTool(Tool):
                     "command": {
                         "type": "string",
                         "description": "The shell command to execute."
+                    },
+                    "timeout_s": {
+                        "type": "number",
+                        "description": "Wall-clock limit in seconds (default: 600). The command is killed when it is exceeded."
+                    },
+                    "session_action": {
+                        "type": "string",
+                        "enum": ["reset", "kill"],
+                        "description": "Persistent-session control: 'reset' starts a fresh shell before running command (may be empty); 'kill' stops the session."
                     }
                 },
                 "required": ["command"]
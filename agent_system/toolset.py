@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+if TYPE_CHECKING:
+    from .core import Tool
+
+
+class ToolSet:
+    """
+    An ordered set of tools whose prompt renderings are built once per version.
+
+    Schemas, the schema block of the agent prompt, the one-line descriptions used by
+    the planners and the native `tools` specs are serialized on first use and reused
+    until the set changes (`add`/`remove` bump `version`). `digest` is a content hash
+    of the schemas, so equal tool sets render byte-identical prompt prefixes that
+    provider-side prompt caches can reuse.
+    """
+
+    def __init__(self, tools: Iterable["Tool"] = (), compact: Optional[bool] = None):
+        if compact is None:
+            compact = os.getenv("AI_CONGRESS_COMPACT_SCHEMAS", "1") == "1"
+        self.compact = bool(compact)
+        self._tools: Dict[str, "Tool"] = {}
+        self.version = 0
+        self._cache: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        for tool in tools:
+            self._tools[tool.name] = tool
+
+    def add(self, tool: "Tool") -> None:
+        with self._lock:
+            self._tools[tool.name] = tool
+            self.version += 1
+            self._cache = {}
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            if self._tools.pop(name, None) is not None:
+                self.version += 1
+                self._cache = {}
+
+    def get(self, name: str) -> Optional["Tool"]:
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __iter__(self) -> Iterator["Tool"]:
+        return iter(list(self._tools.values()))
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def as_dict(self) -> Dict[str, "Tool"]:
+        """The name -> tool mapping (live; do not mutate it directly)."""
+        return self._tools
+
+    def _cached(self, key: str, build) -> Any:
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+    def schemas(self) -> Dict[str, Dict[str, Any]]:
+        return self._cached("schemas", lambda: {name: t.to_schema() for name, t in self._tools.items()})
+
+    def schema(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.schemas().get(name)
+
+    def _build_schema_text(self) -> str:
+        schemas = self.schemas()
+        if self.compact:
+            return "\n".join(json.dumps(s, separators=(",", ":")) for s in schemas.values())
+        return "\n".join(json.dumps(s, indent=2) for s in schemas.values())
+
+    def schema_text(self) -> str:
+        """Every schema as JSON, one after another (compact: one line per tool)."""
+        return self._cached("schema_text", self._build_schema_text)
+
+    def descriptions(self) -> str:
+        """"- name: description" lines for prompts that only need an overview."""
+        return self._cached("descriptions", lambda: "\n".join(f"- {t.name}: {t.description}" for t in self._tools.values()))
+
+    def function_specs(self) -> List[Dict[str, Any]]:
+        """Schemas in the OpenAI `tools` request format."""
+        return self._cached("function_specs", lambda: [{"type": "function", "function": s} for s in self.schemas().values()])
+
+    @property
+    def digest(self) -> str:
+        """Hash of the canonical schema serialization; changes only when a schema does."""
+        return self._cached(
+            "digest",
+            lambda: hashlib.sha256(
+                json.dumps(list(self.schemas().values()), sort_keys=True, separators=(",", ":")).encode("utf-8")
+            ).hexdigest()[:16],
+        )
+
+
+def tools_description(tools: Union[str, ToolSet]) -> str:
+    """The planner-facing tool overview, whether given as a ToolSet or pre-rendered text."""
+    if isinstance(tools, ToolSet):
+        return tools.descriptions()
+    return tools
@@ -0,0 +1,249 @@
+import contextvars
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, IO, Iterator, List, Optional, Set
+
+_current: "contextvars.ContextVar[Optional[Transaction]]" = contextvars.ContextVar(
+    "ai_congress_transaction", default=None
+)
+_ids = itertools.count(1)
+
+_umask_lock = threading.Lock()
+
+
+def _current_umask() -> int:
+    """
+    The process umask, read when needed: from /proc/self/status where available,
+    otherwise by setting it and restoring it at once, under a lock.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    with _umask_lock:
+        mask = os.umask(0)
+        os.umask(mask)
+    return mask
+
+
+def _fsync_path(path: str) -> None:
+    flags = (os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)) if os.path.isdir(path) else os.O_RDONLY
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some platforms/filesystems (e.g. directories on Windows) cannot be fsynced.
+        pass
+    finally:
+        os.close(fd)
+
+
+def _parent(path: str) -> str:
+    return os.path.dirname(os.path.abspath(path))
+
+
+class Transaction:
+    """
+    Groups file mutations so they commit or roll back together.
+
+    Before a file is first replaced or removed, it is copied to a hidden undo entry
+    next to it (a copy, not a hard link, so in-place writes by other tools cannot
+    change the backup); a symlink is journaled by its target. Rolling back renames
+    the undo entries into place, recreates symlinks and removes files the
+    transaction created, then the directories it created if they are empty again.
+
+    Fsyncs are batched: inside a transaction, written files and their directories are
+    synced once each at commit instead of on every write.
+    """
+
+    def __init__(self):
+        self.id = next(_ids)
+        self._journal: Dict[str, Optional[str]] = {}  # path -> undo entry (None: did not exist)
+        self._links: Dict[str, str] = {}  # path -> target, for paths that were symlinks
+        self._directories: List[str] = []  # directories created by this transaction, outermost first
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _undo_path(self, path: str) -> str:
+        directory, base = os.path.split(path)
+        return os.path.join(directory, f".{base}.undo-{os.getpid()}-{self.id}")
+
+    def record(self, path: str) -> None:
+        """Journals the current state of path before its first change in this transaction."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._journal:
+                return
+            if not os.path.lexists(path):
+                self._journal[path] = None
+                return
+            if os.path.islink(path):
+                self._links[path] = os.readlink(path)
+                self._journal[path] = None
+                return
+            undo = self._undo_path(path)
+            shutil.copy2(path, undo)
+            self._journal[path] = undo
+
+    def record_directories(self, directories: List[str]) -> None:
+        """Journals directories this transaction created (outermost first)."""
+        with self._lock:
+            self._directories.extend(os.path.abspath(d) for d in directories)
+
+    def mark_dirty(self, path: str) -> None:
+        with self._lock:
+            self._dirty.add(os.path.abspath(path))
+
+    def changed_paths(self) -> List[str]:
+        return sorted(self._journal)
+
+    def commit(self) -> None:
+        if self.closed:
+            return
+        directories = set()
+        for path in sorted(self._dirty):
+            if os.path.exists(path):
+                _fsync_path(path)
+            directories.add(_parent(path))
+        for path in [*self._journal, *self._directories]:
+            directories.add(_parent(path))
+        for directory in sorted(directories):
+            _fsync_path(directory)
+        for undo in self._journal.values():
+            if undo:
+                try:
+                    os.remove(undo)
+                except OSError:
+                    pass
+        self._finish()
+
+    def rollback(self) -> List[str]:
+        """Restores every journaled path. Returns the paths that were restored."""
+        if self.closed:
+            return []
+        restored = []
+        for path, undo in self._journal.items():
+            try:
+                if undo is None:
+                    if os.path.lexists(path):
+                        os.remove(path)
+                    if path in self._links:
+                        os.symlink(self._links[path], path)
+                else:
+                    os.replace(undo, path)
+                restored.append(path)
+            except OSError:
+                pass
+        # Innermost first; a directory that now holds other files is left in place.
+        for directory in reversed(self._directories):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        for directory in sorted({_parent(p) for p in [*self._journal, *self._directories]}):
+            _fsync_path(directory)
+        self._finish()
+        return restored
+
+    def _finish(self) -> None:
+        self._journal = {}
+        self._links = {}
+        self._directories = []
+        self._dirty = set()
+        self.closed = True
+
+    def __enter__(self) -> "Transaction":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        # An interrupt is the user stopping the run, not a failure: keep what was done.
+        if exc_type is None or issubclass(exc_type, KeyboardInterrupt):
+            self.commit()
+        else:
+            self.rollback()
+
+
+def current_transaction() -> Optional[Transaction]:
+    return _current.get()
+
+
+@contextmanager
+def open_atomic(path: str, mode: str = "w", encoding: Optional[str] = "utf-8", newline: Optional[str] = None) -> Iterator[IO]:
+    """
+    Opens a temporary file next to path; on a clean exit it replaces path atomically.
+
+    Readers see either the old or the new content, never a partial file. If the block
+    raises, the temporary file is discarded and path is left untouched.
+    """
+    if "b" in mode:
+        encoding = newline = None
+    # Write through symlinks, as open() does, instead of replacing the link itself.
+    path = os.path.realpath(path)
+    directory = _parent(path)
+    tx = current_transaction()
+    missing = []
+    ancestor = directory
+    while not os.path.isdir(ancestor) and ancestor != _parent(ancestor):
+        missing.append(ancestor)
+        ancestor = _parent(ancestor)
+    if missing:
+        os.makedirs(directory, exist_ok=True)
+        if tx is not None:
+            tx.record_directories(missing[::-1])
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            if tx is None:
+                os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the permissions of the file being replaced.
+        try:
+            shutil.copymode(path, tmp_path)
+        except OSError:
+            os.chmod(tmp_path, 0o666 & ~_current_umask())
+        if tx is not None:
+            tx.record(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if tx is None:
+        _fsync_path(directory)
+    else:
+        tx.mark_dirty(path)
+
+
+def atomic_write(path: str, data, encoding: str = "utf-8", newline: Optional[str] = None) -> None:
+    """Writes str or bytes to path through open_atomic."""
+    mode = "wb" if isinstance(data, (bytes, bytearray)) else "w"
+    with open_atomic(path, mode, encoding=encoding, newline=newline) as f:
+        f.write(data)
+
+
+def remove_file(path: str) -> None:
+    """Removes path; inside a transaction the removal is journaled so it can be undone."""
+    tx = current_transaction()
+    if tx is not None:
+        tx.record(path)
+    os.remove(path)
+    if tx is None:
+        _fsync_path(_parent(path))
@@ -1,5 +1,7 @@
 import os
+import threading
 import time
+from contextlib import contextmanager
 from typing import List, Optional, Dict, Any
 from rich.console import Console
 from rich.panel import Panel
@@ -56,6 +58,66 @@ ASCII_LOGO = r"""
 @@@==========================@@@
 """
 
+class LiveStream:
+    """
+    Renders a streamed assistant response in place while tokens arrive.
+
+    Deltas are appended to a line buffer; rich's refresh thread re-renders the
+    visible tail at most `refresh_per_second` times, so the cost of a redraw does
+    not grow with the length of the response.
+    """
+
+    def __init__(self, console: Console, title: str = "", refresh_per_second: float = 8):
+        self.console = console
+        self.title = title
+        self._lines: List[str] = []
+        self._partial = ""
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._rendered = None
+        self._live = Live(
+            console=console,
+            get_renderable=self._renderable,
+            refresh_per_second=refresh_per_second,
+            transient=True,
+        )
+        self._live.start()
+
+    def _renderable(self):
+        with self._lock:
+            if self._dirty:
+                self._rendered = self._render()
+                self._dirty = False
+            return self._rendered
+
+    def _render(self):
+        gutter = Text("●", style=COLORS["toolStreaming"])
+        if not self._lines and not self._partial:
+            return self._grid(gutter, Text(self.title, style="dim white"))
+        # Only the tail fits on screen; new tokens always arrive at the bottom.
+        max_lines = max(1, self.console.height - 4)
+        tail = self._lines[-max_lines:]
+        if self._partial:
+            tail = tail[1:] + [self._partial] if len(tail) >= max_lines else tail + [self._partial]
+        return self._grid(gutter, Markdown("\n".join(tail)))
+
+    def _grid(self, gutter, content):
+        table = Table.grid(padding=(0, 1))
+        table.add_column(style="bold", width=2, justify="center")
+        table.add_column(ratio=1)
+        table.add_row(gutter, content)
+        return table
+
+    def update(self, delta: str):
+        with self._lock:
+            parts = (self._partial + delta).split("\n")
+            self._lines.extend(parts[:-1])
+            self._partial = parts[-1]
+            self._dirty = True
+
+    def close(self):
+        self._live.stop()
+
 class UI:
     def __init__(self):
         self.theme = Theme({
@@ -72,6 +134,7 @@ class UI:
         })
         self.console = Console(theme=self.theme)
         self.spinner = Spinner("dots", style=COLORS["primaryAccent"])
+        self._status = None
 
     def _create_gutter_table(self, gutter_content, main_content):
         """Creates a 2-column table for the gutter layout."""
@@ -181,6 +244,10 @@ class UI:
         """Prints a chunk of text directly (for streaming)."""
         self.console.print(chunk, end="")
 
+    def stream_live(self, title: str = "") -> LiveStream:
+        """Starts a live region that renders streamed tokens; call close() when done."""
+        return LiveStream(self.console, title)
+
     def input(self, prompt_text: str = "") -> str:
         """Custom input with styled prompt."""
         # Print the divider line
@@ -191,9 +258,29 @@ class UI:
         prompt_style = Style(color=COLORS["inputPrompt"])
         return Prompt.ask(f"[{COLORS['inputPrompt']}]> [/{COLORS['inputPrompt']}]", console=self.console)
 
+    @contextmanager
     def status(self, message: str):
-        """Returns a status context manager."""
-        return self.console.status(message, spinner="dots", spinner_style=COLORS["primaryAccent"])
+        """Shows a status spinner for the duration of the block."""
+        status = self.console.status(message, spinner="dots", spinner_style=COLORS["primaryAccent"])
+        self._status = status
+        try:
+            with status:
+                yield status
+        finally:
+            if self._status is status:
+                self._status = None
+
+    def update_status(self, message: str):
+        """Replaces the text of the active status spinner (e.g. with tool progress)."""
+        status = self._status
+        if status is not None:
+            status.update(message)
+
+    def stop_status(self):
+        """Stops and clears the active status spinner; later updates are ignored."""
+        status, self._status = self._status, None
+        if status is not None:
+            status.stop()
 
 # Global UI instance
 ui = UI()
@@ -0,0 +1,125 @@
+import json
+import re
+import time
+
+from agent_system.tool_calls import repair_json, scan_tool_calls
+
+
+def legacy_parse_tool_calls(content: str):
+    """The previous Agent._parse_tool_calls, kept here as the benchmark baseline."""
+    tool_calls = []
+
+    matches = re.findall(r"```json\s*(\{.*?\})\s*```", content, re.DOTALL)
+    for match in matches:
+        try:
+            data = json.loads(match)
+            if "tool" in data:
+                tool_calls.append((data["tool"], data.get("args", {})))
+        except json.JSONDecodeError:
+            try:
+                data = json.loads(repair_json(match))
+                if "tool" in data:
+                    tool_calls.append((data["tool"], data.get("args", {})))
+            except:
+                pass
+
+    if tool_calls:
+        return tool_calls
+
+    decoder = json.JSONDecoder()
+    idx = 0
+    length = len(content)
+    while idx < length:
+        try:
+            obj, end = decoder.raw_decode(content[idx:])
+            idx += end
+            if isinstance(obj, dict) and "tool" in obj:
+                tool_calls.append((obj["tool"], obj.get("args", {})))
+        except json.JSONDecodeError:
+            if content[idx:].strip().startswith('{"tool"'):
+                balance = 0
+                start_idx = content.find('{', idx)
+                if start_idx == -1:
+                    idx += 1
+                    continue
+                found = False
+                for i, char in enumerate(content[start_idx:], start=start_idx):
+                    if char == '{':
+                        balance += 1
+                    elif char == '}':
+                        balance -= 1
+                        if balance == 0:
+                            candidate = content[start_idx:i+1]
+                            try:
+                                obj = json.loads(repair_json(candidate))
+                                if isinstance(obj, dict) and "tool" in obj:
+                                    tool_calls.append((obj["tool"], obj.get("args", {})))
+                                    idx = i + 1
+                                    found = True
+                                    break
+                            except:
+                                pass
+                            break
+                if not found:
+                    idx += 1
+            else:
+                idx += 1
+
+    return tool_calls
+
+
+# The unfenced search_text call from debug_json.py: needs backslash repair.
+DEBUG_JSON_CALL = r"""
+     {
+       "tool": "search_text",
+       "args": {
+         "pattern": "<script>[\s\S]*?</script>",
+         "path": "D:\\Projects\\Javacript\\Landing\\index.html",
+         "regex": true,
+         "case_sensitive": false,
+         "max_results": 500
+       }
+     }
+"""
+
+PROSE = (
+    "The function `parse(x)` returns a dict like {\"a\": 1}, and the \"quoted\" config "
+    "key `paths\\windows` matters. Next I will inspect the module layout and explain it.\n"
+)
+
+
+def make_responses(size: int):
+    prose = PROSE * (size // len(PROSE) + 1)
+    prose = prose[:size]
+    return {
+        "prose, no tool call": prose,
+        "prose + unfenced debug_json call": prose + DEBUG_JSON_CALL,
+        "prose + fenced call": prose + "```json\n" + DEBUG_JSON_CALL.strip() + "\n```\n",
+    }
+
+
+def bench(fn, content: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'response':<36} {'chars':>8} {'legacy ms':>10} {'scanner ms':>11} {'same calls':>11}")
+    for size in (2_000, 10_000, 40_000):
+        for label, content in make_responses(size).items():
+            legacy_calls = legacy_parse_tool_calls(content)
+            scan = scan_tool_calls(content)
+            legacy_ms = bench(legacy_parse_tool_calls, content, 3) * 1000
+            scanner_ms = bench(scan_tool_calls, content, 3) * 1000
+            print(
+                f"{label:<36} {len(content):>8} {legacy_ms:>10.2f} {scanner_ms:>11.3f} "
+                f"{str(legacy_calls == scan.calls):>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
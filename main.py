@@ -2,50 +2,96 @@ import os
 from dotenv import load_dotenv
 
 from agent_system.core import Agent
+from agent_system.toolset import ToolSet
 from agent_system.tools import ALL_TOOLS
-from agent_system.planning import President, Deputy, Parliament
-from agent_system.llm import OpenAILikeProvider
+from agent_system.planning import President, Deputy, Parliament, PlanStore, Triage
+from agent_system.llm import OpenAILikeProvider, AsyncOpenAILikeProvider, CachedProvider, ResponseCache
 from agent_system.ui import ui
 
-# Load environment variables
-load_dotenv()
+def build_providers():
+    """
+    Returns (provider, planning_provider). Called from main(), not at import: search_text's
+    process-pool workers (spawn/forkserver) re-import this module and must not repeat the setup.
+    """
+    if os.getenv("AI_CONGRESS_ASYNC_PROVIDER", "0") == "1":
+        # One event loop and a bounded connection pool shared by the President, Deputies and Agent.
+        provider = AsyncOpenAILikeProvider(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url="https://unifiedai.runasp.net/v1",
+            max_connections=int(os.getenv("AI_CONGRESS_MAX_CONNECTIONS", "20")),
+        )
+    else:
+        provider = OpenAILikeProvider(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url="https://unifiedai.runasp.net/v1"
+        )
+
+    # Opt-in: planning prompts repeat verbatim across retries and replayed objectives; serve them from cache.
+    # The executing Agent keeps the raw provider since its outputs depend on the file system.
+    planning_provider = provider
+    if os.getenv("AI_CONGRESS_CACHE", "0") == "1":
+        planning_provider = CachedProvider(
+            provider,
+            ResponseCache(
+                max_entries=int(os.getenv("AI_CONGRESS_CACHE_MAX_ENTRIES", "512")),
+                ttl_s=float(os.getenv("AI_CONGRESS_CACHE_TTL_S", "0")) or None,
+                path=os.getenv("AI_CONGRESS_CACHE_PATH") or None,
+            ),
+        )
+    return provider, planning_provider
+
+# Who made a triage decision, as told to the executing agent.
+TRIAGE_SOURCES = {
+    "llm": "The president",
+    "rules": "A quick rule-based check",
+    "model": "A classifier trained on earlier decisions",
+}
 
-# Initialize LLM Provider
-provider = OpenAILikeProvider(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    base_url="https://unifiedai.runasp.net/v1"
-)
+def execution_prompt(objective: str, plan: str) -> str:
+    return (
+        f"Objective: {objective}\n\n"
+        f"APPROVED PLAN:\n{plan}\n\n"
+        "Please execute this plan step by step. Use the tools as needed."
+    )
 
 def main():
+    # Load environment variables
+    load_dotenv()
+    provider, planning_provider = build_providers()
+
     ui.print_welcome(model="moonshot-MBZUAI-IFM/K2-Think")
     
     # Initialize tools
-    tools = ALL_TOOLS
-    tools_desc = "\n".join([f"- {t.name}: {t.description}" for t in tools])
+    # Built once: the agent, the president and every deputy reuse the same renderings.
+    tools = ToolSet(ALL_TOOLS)
     
     # Initialize Parliament
-    president = President(model="moonshot-MBZUAI-IFM/K2-Think", provider=provider)
+    president = President(model="moonshot-MBZUAI-IFM/K2-Think", provider=planning_provider)
     deputies = [
         Deputy(
             name="Architect",
             model="moonshot-MBZUAI-IFM/K2-Think",
             persona="You are a Software Architect. You focus on modularity, clean code, and scalability. You are critical of messy or unstructured plans.",
-            provider=provider
+            provider=planning_provider
         ),
         Deputy(
             name="Security",
             model="moonshot-MBZUAI-IFM/K2-Think",
             persona="You are a Security Expert. You focus on safety, permissions, and avoiding dangerous commands. You are critical of loose file permissions or shell usage.",
-            provider=provider
+            provider=planning_provider
         ),
         Deputy(
             name="Product Manager",
             model="moonshot-MBZUAI-IFM/K2-Think",
             persona="You are a Product Manager. You focus on user value and simplicity. You ensure the plan actually solves the user's request efficiently.",
-            provider=provider
+            provider=planning_provider
         )
     ]
-    parliament = Parliament(president=president, deputies=deputies, ui=ui)
+    # Approved plans are remembered per objective, tool set and working directory.
+    plan_store = PlanStore() if os.getenv("AI_CONGRESS_PLAN_STORE", "0") == "1" else None
+    parliament = Parliament(president=president, deputies=deputies, ui=ui, plan_store=plan_store)
+    # Local rules and a model learned from past decisions; the LLM is asked only when both are unsure.
+    triage = Triage(president)
     
     # Initialize Agent
     system_prompt = "You are a helpful AI assistant capable of using tools to interact with the file system."
@@ -67,15 +113,30 @@ def main():
 
             ui.print_user_message(user_input)
 
-            decision = president.should_plan(user_input, tools_desc)
+            # A plan approved earlier for the same objective skips triage and the vote.
+            approved_plan = parliament.recall(user_input, tools)
+            if approved_plan is not None:
+                ui.console.print("[bold green]Reusing the plan approved earlier for this objective.[/bold green]")
+                response = agent.run(execution_prompt(user_input, approved_plan))
+                ui.print_assistant_message(response)
+                continue
+
+            decision = triage.decide(user_input, tools)
             should_plan = decision.get("plan", True)
             reason = decision.get("reason", "No reason provided.")
 
+            if decision.get("answer"):
+                # Answered within the triage call itself.
+                agent.record_exchange(user_input, decision["answer"])
+                ui.print_assistant_message(decision["answer"])
+                continue
+
             if not should_plan:
-                ui.console.print(f"[bold yellow]Skipping planning[/bold yellow]: {reason}")
+                ui.console.print(f"[bold yellow]Skipping planning[/bold yellow] ({decision['source']}): {reason}")
+                decided_by = TRIAGE_SOURCES.get(decision.get("source"), "Triage")
                 direct_prompt = (
                     f"Objective: {user_input}\n\n"
-                    f"The president decided planning is not required because: {reason}\n"
+                    f"{decided_by} decided planning is not required because: {reason}\n"
                     "Respond directly. Use tools only if they clearly add value."
                 )
                 response = agent.run(direct_prompt)
@@ -84,17 +145,11 @@ def main():
             
             # 1. Parliament Session
             with ui.status("Parliament is in session..."):
-                approved_plan = parliament.conduct_session(user_input, tools_desc)
+                approved_plan = parliament.conduct_session(user_input, tools)
             
             # 2. Agent Execution
             ui.console.print("[bold green]Agent is executing the plan...[/bold green]")
-            execution_prompt = (
-                f"Objective: {user_input}\n\n"
-                f"APPROVED PLAN:\n{approved_plan}\n\n"
-                "Please execute this plan step by step. Use the tools as needed."
-            )
-            
-            response = agent.run(execution_prompt)
+            response = agent.run(execution_prompt(user_input, approved_plan))
             
             ui.print_assistant_message(response)
             